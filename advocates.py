@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+ADVOCATES_FILE = os.environ.get(
+    'ADVOCATES_FILE', os.path.join(os.path.dirname(__file__), 'advocates.json'))
+
+SEARCH_SORT_KEYS = ('rating', 'experience', 'name')
+SEARCH_FACETS = ('specialty', 'location', 'language')
+MAX_SEARCH_LIMIT = 100
+
+# Active meetings per day after which an advocate is shown as unavailable
+DAILY_MEETING_CAPACITY = int(os.environ.get('ADVOCATE_DAILY_CAPACITY', '8'))
+
+def _key(value):
+    return value.strip().casefold()
+
+def _years(experience):
+    match = re.search(r'\d+', str(experience or ''))
+    return int(match.group()) if match else 0
+
+def _rating(rating):
+    try:
+        return float(rating)
+    except (TypeError, ValueError):
+        return 0.0
+
+def load_advocates(path=ADVOCATES_FILE):
+    """Read the advocate registry from its JSON data file"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+class _Index:
+    """Immutable lookup structures built from one snapshot of the registry"""
+
+    def __init__(self, advocates):
+        self.advocates = list(advocates)
+        self.by_id = {}
+        self.facets = {facet: {} for facet in SEARCH_FACETS}
+        for advocate in self.advocates:
+            self.by_id[advocate['id']] = advocate
+            self._add('specialty', advocate.get('specialty'), advocate['id'])
+            self._add('location', advocate.get('location'), advocate['id'])
+            for language in advocate.get('languages') or ():
+                self._add('language', language, advocate['id'])
+
+        # Ids pre-sorted best first, ties broken by id, for each sort key
+        self.sorted_ids = {
+            'rating': self._sorted(lambda a: (-_rating(a.get('rating')), a['id'])),
+            'experience': self._sorted(lambda a: (-_years(a.get('experience')), a['id'])),
+            'name': self._sorted(lambda a: (_key(a.get('name', '')), a['id'])),
+        }
+        self.rank = {sort: {advocate_id: position for position, advocate_id in enumerate(ids)}
+                     for sort, ids in self.sorted_ids.items()}
+
+    def _add(self, facet, value, advocate_id):
+        if value:
+            self.facets[facet].setdefault(_key(value), set()).add(advocate_id)
+
+    def _sorted(self, key):
+        return [a['id'] for a in sorted(self.advocates, key=key)]
+
+class AdvocateDirectory:
+    """In-memory advocate registry with a primary index by id and inverted
+    indexes on specialty, location and language.
+
+    Lookups by id are a dict hit. Searches intersect the matching posting
+    sets (smallest first) and order the survivors by precomputed rank, so
+    a filtered search never scans the whole registry. ``reload()`` builds a
+    fresh index and swaps it in atomically; readers always see one
+    consistent snapshot.
+    """
+
+    def __init__(self, advocates=()):
+        self._lock = threading.Lock()
+        self._index = _Index(advocates)
+        # Bumped on every reload so derived caches know to rebuild
+        self.generation = 0
+
+    @classmethod
+    def from_file(cls, path=ADVOCATES_FILE):
+        return cls(load_advocates(path))
+
+    def reload(self, advocates):
+        index = _Index(advocates)
+        with self._lock:
+            self._index = index
+            self.generation += 1
+
+    def all(self):
+        return self._index.advocates
+
+    def get(self, advocate_id):
+        return self._index.by_id.get(advocate_id)
+
+    def get_or_default(self, advocate_id):
+        """The advocate with this id, falling back to the first one listed"""
+        index = self._index
+        advocate = index.by_id.get(advocate_id)
+        if advocate is None and index.advocates:
+            advocate = index.advocates[0]
+        return advocate
+
+    def facet_values(self, facet):
+        return sorted(self._index.facets[facet])
+
+    def _candidates(self, index, filters):
+        # Values within one facet are OR-ed, facets are AND-ed together
+        postings = []
+        for facet in SEARCH_FACETS:
+            values = filters.get(facet)
+            if not values:
+                continue
+            matched = set()
+            for value in values:
+                matched |= index.facets[facet].get(_key(value), set())
+            postings.append(matched)
+        if not postings:
+            return None
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, filters=None, available=None, sort='rating', order='desc',
+               limit=20, offset=0, availability=None):
+        """One page of advocates matching every filter.
+
+        ``filters`` maps specialty/location/language to a list of accepted
+        values (case-insensitive). ``availability`` maps advocate id to the
+        live flag (see AdvocateListCache.availability); when given, it
+        drives the ``available`` filter and the returned copies carry it.
+        Returns ``(advocates, total)``.
+        """
+        if sort not in SEARCH_SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SEARCH_SORT_KEYS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_SEARCH_LIMIT}")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+        index = self._index
+        candidates = self._candidates(index, filters or {})
+
+        # name sorts A-Z by default; rating and experience best first
+        if candidates is None:
+            ids = index.sorted_ids[sort]
+        else:
+            ids = sorted(candidates, key=index.rank[sort].__getitem__)
+        if (order == 'asc') != (sort == 'name'):
+            ids = reversed(ids)
+
+        matches = []
+        for advocate_id in ids:
+            advocate = index.by_id[advocate_id]
+            if availability is None:
+                flag = bool(advocate.get('available'))
+            else:
+                flag = availability.get(advocate_id, False)
+            if available is not None and flag != available:
+                continue
+            matches.append((advocate, flag))
+
+        page = matches[offset:offset + limit]
+        if availability is None:
+            return [advocate for advocate, _ in page], len(matches)
+        # Copies, so the registry's own records are never mutated
+        return [dict(advocate, available=flag) for advocate, flag in page], len(matches)
+
+    def __len__(self):
+        return len(self._index.advocates)
+
+class AdvocateListCache:
+    """The serialized ``/api/advocates`` body and its ETag, built once.
+
+    ``get()`` takes an opaque bookings version (anything that changes when
+    a meeting is written) and a loader for today's load per advocate name.
+    While the version and directory generation are unchanged the cached
+    bytes are served as-is. Otherwise availability is recomputed, and the
+    body is only re-serialized if some advocate's availability flipped.
+    """
+
+    def __init__(self, directory, capacity=DAILY_MEETING_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._version = None
+        self._availability = None
+        self._generation = None
+        self._body = None
+        self._etag = None
+        self._by_id = {}
+        self.builds = 0
+
+    def _is_available(self, advocate, load):
+        return bool(advocate.get('available')) and load.get(advocate['name'], 0) < self.capacity
+
+    def get(self, version, load_bookings):
+        """``(body, etag)`` for the current advocates payload"""
+        body, etag, _ = self._refresh(version, load_bookings)
+        return body, etag
+
+    def availability(self, version, load_bookings):
+        """Live availability flag per advocate id, as served by ``get()``"""
+        return self._refresh(version, load_bookings)[2]
+
+    def _refresh(self, version, load_bookings):
+        generation = self.directory.generation
+        with self._lock:
+            if version == self._version and generation == self._generation:
+                return self._body, self._etag, self._by_id
+
+        load = load_bookings()
+        advocates = self.directory.all()
+        availability = tuple(self._is_available(a, load) for a in advocates)
+
+        with self._lock:
+            if availability != self._availability or generation != self._generation:
+                # Copies, so the registry's own records are never mutated
+                payload = {
+                    "status": "success",
+                    "advocates": [dict(a, available=flag) for a, flag in zip(advocates, availability)],
+                    "count": len(advocates)
+                }
+                self._body = json.dumps(payload).encode('utf-8')
+                self._etag = hashlib.sha1(self._body).hexdigest()[:24]
+                self._availability = availability
+                self._by_id = {a['id']: flag for a, flag in zip(advocates, availability)}
+                self._generation = generation
+                self.builds += 1
+            self._version = version
+            return self._body, self._etag, self._by_id
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
@@ -1,12 +1,39 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, session, make_response, g
 import os
 from datetime import datetime
 import database as db
+from realtime import ChatNotifier, RoomBroadcaster
+from state import create_state
+from chat_cache import ChatRoomCache
+from advocates import AdvocateDirectory, AdvocateListCache, SEARCH_FACETS
+from scheduling import DayIntervals, parse_duration, to_minutes
+from applog import configure_logging, get_logger, get_logging_stats, request_id_var, room_var
+from metrics import Registry, instrument_functions
+import contextvars
+import csv
+import html
+import io
 import json
+import queue
 import uuid
+import hashlib
+import threading
+import time
 from functools import wraps
 
+try:
+    from flask_sock import Sock
+except ImportError:  # WebSocket transport is optional; clients fall back to polling
+    Sock = None
+
 app = Flask(__name__)
+
+# Structured JSON logs, written by a background thread
+configure_logging()
+log = get_logger('app')
+chat_log = get_logger('chat')
+webrtc_log = get_logger('webrtc')
+admin_log = get_logger('admin')
 app.secret_key = 'advocate-chat-secret-2025-updated-secure-admin'
 
 # ===== ADMIN AUTHENTICATION SETTINGS =====
@@ -14,64 +41,60 @@ ADMIN_USERNAME = "admin"
 ADMIN_PASSWORD = "easelaw@admin"
 
 # Global variables
-webrtc_rooms = {}
-chat_rooms = {}
-
-# Enhanced advocates data with more details
-advocates_data = [
-    {
-        "id": "adv1",
-        "name": "Adv. Rajesh Kumar",
-        "specialty": "Criminal Law",
-        "experience": "12 years",
-        "rating": "4.8",
-        "available": True,
-        "description": "Specialized in criminal defense, white-collar crimes, and legal consultations",
-        "location": "New Delhi",
-        "languages": ["Hindi", "English", "Punjabi"],
-        "consultation_fee": "₹2000/hour",
-        "education": "LLB from Delhi University, LLM in Criminal Law"
-    },
-    {
-        "id": "adv2", 
-        "name": "Adv. Priya Sharma",
-        "specialty": "Family Law",
-        "experience": "8 years",
-        "rating": "4.9",
-        "available": True,
-        "description": "Expert in divorce, child custody, domestic disputes, and matrimonial cases",
-        "location": "Mumbai",
-        "languages": ["Hindi", "English", "Marathi"],
-        "consultation_fee": "₹1500/hour",
-        "education": "LLB from Mumbai University, specialization in Family Law"
-    },
-    {
-        "id": "adv3",
-        "name": "Adv. Amit Singh",
-        "specialty": "Corporate Law", 
-        "experience": "15 years",
-        "rating": "4.7",
-        "available": True,
-        "description": "Corporate legal advisor, business contracts, mergers & acquisitions",
-        "location": "Gurugram",
-        "languages": ["Hindi", "English"],
-        "consultation_fee": "₹3000/hour",
-        "education": "LLB from National Law University, MBA in Corporate Finance"
-    },
-    {
-        "id": "adv4",
-        "name": "Adv. Kavya Reddy",
-        "specialty": "Property Law",
-        "experience": "10 years", 
-        "rating": "4.6",
-        "available": False,
-        "description": "Real estate disputes, property transactions, land acquisition cases",
-        "location": "Hyderabad",
-        "languages": ["Telugu", "Hindi", "English"],
-        "consultation_fee": "₹1800/hour",
-        "education": "LLB from Osmania University, specialization in Property Law"
-    }
-]
+chat_rooms = ChatRoomCache()
+chat_notifier = ChatNotifier()
+chat_broadcaster = RoomBroadcaster()
+chat_write_lock = threading.Lock()
+# Wakes a room's signaling sockets when its signals or users change
+signal_broadcaster = RoomBroadcaster()
+
+def _store_signal(room_id, signal):
+    """Queue a signal for its recipient and wake the room's sockets"""
+    seq = signal_store.post(room_id, signal)
+    signal_broadcaster.publish(room_id, seq)
+    return seq
+
+def _post_user_left(room_id, user_id):
+    """Tell the rest of a WebRTC room that a user is gone"""
+    _store_signal(room_id, {
+        'id': str(uuid.uuid4()),
+        'from': user_id,
+        'to': None,
+        'type': 'user-left',
+        'data': {'user_id': user_id},
+        'timestamp': datetime.now().isoformat()
+    })
+
+def _user_expired(room_id, user):
+    webrtc_log.info("Removing inactive user", extra={'event': 'webrtc.user_expired', 'room': room_id, 'user_id': user['id']})
+    _post_user_left(room_id, user['id'])
+
+# WebRTC signals and room membership, plus cross-worker chat delivery:
+# STATE_BACKEND=memory (a single process) or sqlite (shared by N workers).
+# Idle users and empty rooms expire in the background.
+state = create_state(on_user_expired=_user_expired)
+signal_store = state.signals
+webrtc_rooms = state.presence
+
+# Persist chat messages through the background group-commit writer
+CHAT_WRITE_BEHIND = os.environ.get('CHAT_WRITE_BEHIND', '0') == '1'
+
+# Chat polling settings
+CHAT_PAGE_SIZE = 50
+CHAT_SCROLLBACK_MAX = 200
+LONG_POLL_MAX_WAIT = 25  # seconds
+
+# Chat streaming (SSE) settings
+STREAM_HEARTBEAT_INTERVAL = 15  # seconds
+STREAM_MAX_DURATION = 300  # seconds, clients reconnect with Last-Event-ID
+
+# WebSocket transport (needs flask-sock); without it clients keep polling
+sock = Sock(app) if Sock is not None else None
+WS_IDLE_INTERVAL = 5  # seconds between heartbeats on an idle signaling socket
+
+# Advocate registry (advocates.json) with id and facet indexes
+advocate_directory = AdvocateDirectory.from_file()
+advocate_list_cache = AdvocateListCache(advocate_directory)
 
 print("🚀 Flask Legal Chat System Starting...")
 
@@ -82,8 +105,12 @@ print(f"📊 Database path: {db_path}")
 # Initialize database
 try:
     db.init_database()
-    conn = db.get_connection()
-    conn.close()
+    with db.connection() as conn:
+        conn.execute('SELECT 1')
+    # Index chat/meeting text that predates the search migration
+    db.start_search_backfill()
+    # Move chat messages past CHAT_RETENTION_DAYS to the archive database
+    db.start_chat_retention()
     print("✅ Database connection successful!")
 except Exception as e:
     print(f"❌ Database initialization failed: {e}")
@@ -106,7 +133,7 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         # Check if admin is logged in
         if not session.get('admin_logged_in'):
-            print("⚠️ Unauthorized admin access attempt")
+            admin_log.warning("Unauthorized admin access attempt", extra={'event': 'admin.unauthorized', 'path': request.path})
             return redirect(url_for('admin_login'))
         
         # Check session timeout (2 hours)
@@ -114,12 +141,142 @@ def admin_required(f):
             login_time = datetime.fromisoformat(session['admin_login_time'])
             if (datetime.now() - login_time).total_seconds() > 7200:  # 2 hours
                 session.clear()
-                print("⏰ Admin session expired")
+                admin_log.info("Admin session expired", extra={'event': 'admin.session_expired'})
                 return redirect(url_for('admin_login'))
         
         return f(*args, **kwargs)
     return decorated_function
 
+# ===== REQUEST CONTEXT =====
+@app.before_request
+def _bind_request_context():
+    """Tag this request's log records with a request id and room"""
+    g.request_start = time.perf_counter()
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex[:16]
+    request_id_var.set(g.request_id)
+    room_var.set((request.view_args or {}).get('room_id'))
+
+@app.after_request
+def _add_request_id(response):
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
+    if 'request_start' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        http_requests.inc(endpoint, request.method, str(response.status_code))
+        http_latency.observe(time.perf_counter() - g.request_start, endpoint, request.method)
+    return response
+
+@app.teardown_request
+def _clear_request_context(exc=None):
+    request_id_var.set(None)
+    room_var.set(None)
+
+# ===== METRICS =====
+metrics = Registry()
+http_requests = metrics.counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status',
+    ('endpoint', 'method', 'status'))
+http_latency = metrics.histogram(
+    'http_request_duration_seconds', 'Time to build the response (streams: until the first byte)',
+    ('endpoint', 'method'))
+db_latency = metrics.histogram(
+    'db_call_duration_seconds', 'Duration of database.py calls', ('function',))
+db_errors = metrics.counter(
+    'db_call_errors_total', 'database.py calls that raised', ('function',))
+chat_lock_wait = metrics.histogram(
+    'chat_write_lock_wait_seconds', 'Time spent waiting for the chat write lock')
+
+# database.py functions on request paths; module-internal calls are timed too
+DB_TIMED_FUNCTIONS = (
+    'get_stats_counters', 'get_change_versions', 'get_room_version',
+    'register_client', 'register_clients', 'save_chat_message', 'get_chat_messages',
+    'get_all_clients', 'get_all_meetings', 'get_meetings_page', 'get_clients_page',
+    'get_advocate_load', 'get_advocate_bookings', 'update_meeting_status', 'update_meeting_statuses',
+    'get_database_stats', 'search_all', 'get_search_backfill_status',
+)
+instrument_functions(db, DB_TIMED_FUNCTIONS, db_latency, db_errors)
+
+def _pool_stat(key):
+    return lambda: db.get_pool_stats()[key]
+
+def _write_behind_stat(key):
+    def value():
+        stats = db.get_write_behind_stats()
+        return stats[key] if stats else None
+    return value
+
+metrics.gauge('db_pool_connections', 'Open pooled connections', _pool_stat('size'))
+metrics.gauge('db_pool_in_use', 'Pooled connections currently borrowed', _pool_stat('in_use'))
+metrics.callback_counter('db_pool_acquired_total', 'Connections handed out by the pool', _pool_stat('acquired'))
+metrics.callback_counter('db_pool_waits_total', 'Acquisitions that had to wait for a connection', _pool_stat('waits'))
+metrics.callback_counter('db_pool_wait_seconds_total', 'Total time spent waiting for a connection', _pool_stat('wait_seconds'))
+metrics.gauge('chat_rooms_cached', 'Chat rooms held in the message cache', lambda: len(chat_rooms))
+metrics.gauge('chat_cache_bytes', 'Approximate size of the chat message cache', lambda: chat_rooms.stats()['bytes'])
+metrics.callback_counter(
+    'chat_cache_lookups_total', 'Chat cache lookups by result',
+    lambda: {('hit',): chat_rooms.stats()['hits'], ('miss',): chat_rooms.stats()['misses']}, ('result',))
+metrics.gauge('chat_stream_subscribers', 'Open chat SSE streams and sockets', lambda: chat_broadcaster.subscriber_count())
+metrics.gauge('webrtc_socket_subscribers', 'Open WebRTC signaling sockets', lambda: signal_broadcaster.subscriber_count())
+metrics.gauge('webrtc_rooms', 'WebRTC rooms in memory', lambda: len(webrtc_rooms))
+metrics.gauge('webrtc_room_users', 'Users across all WebRTC rooms', lambda: webrtc_rooms.user_count())
+metrics.callback_counter('webrtc_users_expired_total', 'WebRTC users dropped after missing heartbeats',
+                         lambda: webrtc_rooms.stats()['expired_users'])
+metrics.gauge('webrtc_signals_queued', 'Undelivered WebRTC signals across rooms', lambda: signal_store.stats()['signals'])
+metrics.gauge('webrtc_signal_queue_max_depth', 'Deepest per-room WebRTC signal queue',
+              lambda: signal_store.stats()['max_room_depth'])
+metrics.callback_counter('log_records_dropped_total', 'Log records dropped on a full queue',
+                         lambda: get_logging_stats()['dropped'])
+metrics.gauge('chat_write_behind_queued', 'Messages waiting for the group-commit writer', _write_behind_stat('queued'))
+metrics.callback_counter('chat_write_behind_batches_total', 'Group commits written', _write_behind_stat('batches'))
+
+# ===== CONDITIONAL GET =====
+def conditional(version_func):
+    """Decorator answering If-None-Match with 304 while the data version is unchanged
+
+    ``version_func`` receives the view arguments and returns a cheap version
+    token for the resource (or None to skip). It runs before the view, so an
+    unchanged resource is answered without running the expensive queries.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            version = version_func(*args, **kwargs)
+            if version is None:
+                return f(*args, **kwargs)
+            g.resource_version = version
+            
+            etag = hashlib.sha1(f"{request.full_path}|{version}".encode()).hexdigest()[:24]
+            if etag in request.if_none_match:
+                response = app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+def _table_version(*tables):
+    """Version function over the trigger-maintained change_versions table"""
+    def version(*args, **kwargs):
+        versions = db.get_change_versions()
+        return '-'.join(str(versions.get(table, 0)) for table in tables)
+    return version
+
+def _admin_stats_version():
+    versions = db.get_change_versions()
+    return (f"{sorted(versions.items())}|{datetime.now().date()}"
+            f"|{len(webrtc_rooms)}|{len(chat_rooms)}")
+
+def _room_version(room_id):
+    # Long-poll requests wait for changes instead of revalidating
+    if request.args.get('wait', 0, type=float) > 0:
+        return None
+    return db.get_room_version(room_id)
+
 # ===== ADMIN AUTHENTICATION ROUTES =====
 @app.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
@@ -132,10 +289,10 @@ def admin_login():
             session['admin_logged_in'] = True
             session['admin_username'] = username
             session['admin_login_time'] = datetime.now().isoformat()
-            print(f"✅ Admin logged in successfully: {username} at {datetime.now()}")
+            admin_log.info("Admin logged in", extra={'event': 'admin.login', 'username': username})
             return redirect(url_for('admin_dashboard'))
         else:
-            print(f"❌ Failed admin login attempt: username='{username}' from IP={request.remote_addr}")
+            admin_log.warning("Failed admin login attempt", extra={'event': 'admin.login_failed', 'username': username, 'ip': request.remote_addr})
             error_message = "Invalid username or password. Please try again."
             return render_template('admin_login.html', error=error_message)
     
@@ -150,7 +307,7 @@ def admin_logout():
     """Admin logout"""
     username = session.get('admin_username', 'Unknown')
     session.clear()
-    print(f"👋 Admin logged out: {username} at {datetime.now()}")
+    admin_log.info("Admin logged out", extra={'event': 'admin.logout', 'username': username})
     return redirect(url_for('admin_login'))
 
 # ===== MAIN ROUTES =====
@@ -164,7 +321,7 @@ def index():
 def chat():
     """Enhanced chat interface"""
     advocate_id = request.args.get('advocate', 'adv1')
-    advocate = next((adv for adv in advocates_data if adv['id'] == advocate_id), advocates_data[0])
+    advocate = advocate_directory.get_or_default(advocate_id)
     
     return render_template('chat.html', advocate=advocate)
 
@@ -181,7 +338,7 @@ def video_call(room_id):
 def meeting():
     """Enhanced meeting booking"""
     advocate_id = request.args.get('advocate', 'adv1')
-    advocate = next((adv for adv in advocates_data if adv['id'] == advocate_id), advocates_data[0])
+    advocate = advocate_directory.get_or_default(advocate_id)
     
     return render_template('meeting.html', advocate=advocate)
 
@@ -192,38 +349,43 @@ def meeting():
 def admin_dashboard():
     """Secured admin dashboard"""
     admin_username = session.get('admin_username', 'Admin')
-    print(f"📊 Admin dashboard accessed by: {admin_username}")
+    admin_log.info("Admin dashboard accessed", extra={'event': 'admin.dashboard', 'username': admin_username})
     return render_template('admin_dashboard.html', admin_username=admin_username)
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text-format metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health_check():
     """Enhanced health check endpoint"""
     try:
-        # Test database connection
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM clients")
-        client_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings") 
-        meeting_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM chat_messages")
-        message_count = cursor.fetchone()[0]
-        
-        conn.close()
+        # Test database connection (counters are trigger-maintained)
+        totals, _ = db.get_stats_counters()
         
         return jsonify({
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
             "database": "connected",
             "stats": {
-                "clients": client_count,
-                "meetings": meeting_count,
-                "messages": message_count,
+                "clients": totals.get('clients', 0),
+                "meetings": totals.get('meetings', 0),
+                "messages": totals.get('messages', 0),
                 "webrtc_rooms": len(webrtc_rooms),
-                "chat_rooms": len(chat_rooms)
+                "webrtc_presence": webrtc_rooms.stats(),
+                "state_backend": state.name,
+                "chat_rooms": len(chat_rooms),
+                "chat_cache": chat_rooms.stats(),
+                "chat_write_behind": db.get_write_behind_stats(),
+                "chat_stream_subscribers": chat_broadcaster.subscriber_count(),
+                "webrtc_socket_subscribers": signal_broadcaster.subscriber_count(),
+                "websockets": sock is not None,
+                "search_backfill_pending": db.get_search_backfill_status()['pending'],
+                "chat_retention": db.get_chat_retention_stats()
             },
+            "db_pool": db.get_pool_stats(),
+            "logging": get_logging_stats(),
             "version": "2.0.0",
             "features": [
                 "Real-time Chat",
@@ -245,60 +407,110 @@ def health_check():
 
 # ===== API ROUTES =====
 
+def _bookings_version():
+    """Advocate cache version and loader for today's booking load"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    version = (db.get_change_versions().get('meeting_bookings', 0), today)
+    return version, lambda: db.get_advocate_load(today)
+
 @app.route('/api/advocates')
 def get_advocates():
-    """Get all advocates data"""
+    """Get all advocates data
+
+    The JSON body is cached as bytes. Availability comes from today's
+    pending and confirmed bookings, so the cache only changes when
+    meeting_bookings is written.
+    """
     try:
-        print("📋 Fetching advocates data...")
-        
-        # Add dynamic availability (simulate some logic)
-        for advocate in advocates_data:
-            # Simulate dynamic availability based on time
-            import random
-            if random.random() > 0.2:  # 80% chance of being available
-                advocate['available'] = True
-            else:
-                advocate['available'] = False
+        body, etag = advocate_list_cache.get(*_bookings_version())
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        log.exception("Error fetching advocates")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/advocates/search')
+def search_advocates():
+    """Search advocates by specialty, location, language and availability
+
+    Each facet accepts comma-separated values (any of them matches); facets
+    combine with AND. Results sort by rating, experience or name and page
+    with limit/offset. Availability is today's, as in /api/advocates.
+    """
+    try:
+        filters = {
+            facet: [v for v in request.args.get(facet, '').split(',') if v.strip()]
+            for facet in SEARCH_FACETS
+        }
+        available = _flag('available') if 'available' in request.args else None
+        offset = request.args.get('offset', 0, type=int)
+        
+        advocates, total = advocate_directory.search(
+            filters=filters,
+            available=available,
+            sort=request.args.get('sort', 'rating'),
+            order=request.args.get('order', 'asc' if request.args.get('sort') == 'name' else 'desc'),
+            limit=request.args.get('limit', 20, type=int),
+            offset=offset,
+            availability=advocate_list_cache.availability(*_bookings_version())
+        )
+        next_offset = offset + len(advocates)
         
         return jsonify({
             "status": "success",
-            "advocates": advocates_data,
-            "count": len(advocates_data)
+            "advocates": advocates,
+            "count": len(advocates),
+            "total": total,
+            "next_offset": next_offset if next_offset < total else None
         })
         
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
-        print(f"❌ Error fetching advocates: {e}")
+        log.exception("Error searching advocates")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# Largest /api/register-clients batch (one transaction)
+CLIENT_BATCH_MAX = 1000
+
+def _clean_client(data):
+    """Validate a registration body; returns (name, phone, city, email) or raises ValueError"""
+    if not isinstance(data, dict) or not isinstance(data.get('name'), str) or not data['name'].strip():
+        raise ValueError("Name is required")
+    
+    # Validate name
+    name = data['name'].strip()
+    if len(name) < 2:
+        raise ValueError("Name must be at least 2 characters")
+    
+    # Clean and validate optional fields
+    phone = str(data.get('phone') or '').strip()
+    city = str(data.get('city') or '').strip()
+    email = str(data.get('email') or '').strip()
+    
+    # Phone validation if provided
+    if phone and len(phone) < 10:
+        raise ValueError("Please enter a valid phone number")
+    
+    return name, phone, city, email
+
 @app.route('/api/register-client', methods=['POST'])
 def register_client():
     """Enhanced client registration"""
     try:
-        data = request.get_json()
-        print(f"👤 Client registration: {data}")
-        
-        if not data or not data.get('name'):
-            return jsonify({"status": "error", "message": "Name is required"}), 400
-        
-        # Validate name
-        name = data['name'].strip()
-        if len(name) < 2:
-            return jsonify({"status": "error", "message": "Name must be at least 2 characters"}), 400
-        
-        # Clean and validate optional fields
-        phone = data.get('phone', '').strip()
-        city = data.get('city', '').strip()
-        email = data.get('email', '').strip()
-        
-        # Phone validation if provided
-        if phone and len(phone) < 10:
-            return jsonify({"status": "error", "message": "Please enter a valid phone number"}), 400
+        try:
+            name, phone, city, email = _clean_client(request.get_json())
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         
-        # Register client in database
+        # Register client in database (same phone/email updates the existing client)
         client_id = db.register_client(name, phone, city, email)
         
         if client_id:
-            print(f"✅ Client registered: {name} (ID: {client_id})")
             return jsonify({
                 "status": "success",
                 "client_id": client_id,
@@ -314,20 +526,61 @@ def register_client():
             return jsonify({"status": "error", "message": "Registration failed"}), 500
             
     except Exception as e:
-        print(f"❌ Registration error: {e}")
+        log.exception("Registration error")
         return jsonify({"status": "error", "message": "Internal server error"}), 500
 
+@app.route('/api/register-clients', methods=['POST'])
+@admin_required
+def register_clients():
+    """Batch client registration for intake imports
+
+    Body: {"clients": [{name, phone, city, email}, ...]} (or the bare
+    list). Valid clients are registered in one transaction; invalid ones
+    are reported and skipped. Each result carries the client's index and
+    status "created", "updated" (same phone/email) or "error".
+    """
+    try:
+        data = request.get_json(silent=True)
+        clients = data.get('clients') if isinstance(data, dict) else data
+        if not isinstance(clients, list) or not clients:
+            return jsonify({"status": "error", "message": "clients must be a non-empty list"}), 400
+        if len(clients) > CLIENT_BATCH_MAX:
+            return jsonify({"status": "error", "message": f"At most {CLIENT_BATCH_MAX} clients per batch"}), 400
+        
+        results, valid, indexes = [], [], []
+        for index, client in enumerate(clients):
+            try:
+                valid.append(_clean_client(client))
+                indexes.append(index)
+                results.append(None)
+            except ValueError as e:
+                results.append({"index": index, "status": "error", "message": str(e)})
+        
+        registered = db.register_clients(valid) if valid else []
+        for index, (client_id, created) in zip(indexes, registered):
+            results[index] = {"index": index, "status": "created" if created else "updated", "client_id": client_id}
+        
+        statuses = [result['status'] for result in results]
+        counts = {"created": statuses.count('created'), "updated": statuses.count('updated'), "errors": statuses.count('error')}
+        admin_log.info("Clients imported", extra={
+            'event': 'admin.clients_imported',
+            'new_clients': counts['created'],
+            'existing_clients': counts['updated'],
+            'invalid_clients': counts['errors']
+        })
+        return jsonify({"status": "success", "results": results, **counts})
+        
+    except Exception as e:
+        log.exception("Batch registration error")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/book-meeting', methods=['POST'])
 def book_meeting():
     """Enhanced meeting booking with comprehensive validation"""
-    print("📝 Meeting booking request received")
-    
     try:
         data = request.get_json()
-        print(f"📊 Form data received: {data}")
         
         if not data:
-            print("❌ No data provided")
             return jsonify({"status": "error", "message": "No data provided"}), 400
         
         # Enhanced validation
@@ -339,7 +592,7 @@ def book_meeting():
                 missing_fields.append(field)
         
         if missing_fields:
-            print(f"❌ Missing fields: {missing_fields}")
+            log.info("Booking rejected: missing fields", extra={'event': 'meeting.invalid', 'fields': missing_fields})
             return jsonify({
                 "status": "error", 
                 "message": f"Missing required fields: {', '.join(missing_fields)}"
@@ -365,49 +618,67 @@ def book_meeting():
         
         # Add advocate information
         advocate_id = data.get('advocateId', 'adv1')
-        advocate = next((adv for adv in advocates_data if adv['id'] == advocate_id), advocates_data[0])
+        advocate = advocate_directory.get_or_default(advocate_id)
         data['advocateName'] = advocate['name']
         data['advocateSpecialty'] = advocate['specialty']
         
-        print(f"📅 Booking for advocate: {advocate['name']}")
+        # Time and duration validation
+        try:
+            to_minutes(data['meetingTime'])
+            parse_duration(data.get('meetingDuration', '45'))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": f"Invalid meeting time or duration: {e}"}), 400
         
         # Enhanced database insertion
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        # Insert with comprehensive data
-        cursor.execute('''
-            INSERT INTO meeting_bookings (
-                client_name, client_email, client_phone, client_city,
-                advocate_name, meeting_date, meeting_time, meeting_type, meeting_duration,
-                case_type, case_description, urgency_level, previous_legal_action, special_requirements,
-                status, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['clientName'].strip(),
-            data['clientEmail'].strip(), 
-            data['clientPhone'].strip(),
-            data.get('clientCity', '').strip(),
-            data['advocateName'],
-            data['meetingDate'],
-            data['meetingTime'],
-            data['meetingType'],
-            data.get('meetingDuration', '45'),
-            data.get('caseType', ''),
-            data.get('caseDescription', '').strip(),
-            data.get('urgency', 'medium'),
-            data.get('previousLegalAction', 'no'),
-            data.get('specialRequirements', '').strip(),
-            'pending',
-            datetime.now().isoformat()
-        ))
-        
-        booking_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Take the write lock first so the conflict check and the insert
+            # are atomic with respect to other bookings
+            cursor.execute('BEGIN IMMEDIATE')
+            busy = DayIntervals(db.get_advocate_bookings(data['advocateName'], data['meetingDate'], conn))
+            if busy.conflicts_with(data['meetingTime'], data.get('meetingDuration', '45')):
+                conn.rollback()
+                log.info("Slot conflict", extra={'event': 'meeting.conflict', 'advocate': data['advocateName'],
+                                                 'date': data['meetingDate'], 'time': data['meetingTime']})
+                return jsonify({
+                    "status": "error",
+                    "message": "This time slot is no longer available. Please choose another slot.",
+                    "slots": busy.slots(data.get('meetingDuration', '45'))
+                }), 409
+            
+            # Insert with comprehensive data
+            cursor.execute('''
+                INSERT INTO meeting_bookings (
+                    client_name, client_email, client_phone, client_city,
+                    advocate_name, meeting_date, meeting_time, meeting_type, meeting_duration,
+                    case_type, case_description, urgency_level, previous_legal_action, special_requirements,
+                    status, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                data['clientName'].strip(),
+                data['clientEmail'].strip(), 
+                data['clientPhone'].strip(),
+                data.get('clientCity', '').strip(),
+                data['advocateName'],
+                data['meetingDate'],
+                data['meetingTime'],
+                data['meetingType'],
+                data.get('meetingDuration', '45'),
+                data.get('caseType', ''),
+                data.get('caseDescription', '').strip(),
+                data.get('urgency', 'medium'),
+                data.get('previousLegalAction', 'no'),
+                data.get('specialRequirements', '').strip(),
+                'pending',
+                datetime.now().isoformat()
+            ))
+            
+            booking_id = cursor.lastrowid
+            conn.commit()
         
         if booking_id:
-            print(f"✅ Meeting booked successfully: ID {booking_id}")
+            log.info("Meeting booked", extra={'event': 'meeting.booked', 'meeting_id': booking_id, 'advocate': data['advocateName']})
             
             # Generate confirmation number
             confirmation_number = f"LEGAL{booking_id:06d}"
@@ -428,114 +699,293 @@ def book_meeting():
                 }
             })
         else:
-            print("❌ Database booking failed - no ID returned")
+            log.error("Database booking failed - no ID returned")
             return jsonify({"status": "error", "message": "Database insertion failed"}), 500
             
     except Exception as e:
-        print(f"❌ Booking error: {e}")
-        import traceback
-        print(f"Full error traceback: {traceback.format_exc()}")
+        log.exception("Booking error")
         return jsonify({"status": "error", "message": f"Internal server error: {str(e)[:100]}"}), 500
 
-# ===== CHAT SYSTEM ROUTES =====
-
-@app.route('/api/chat/send', methods=['POST'])
-def send_message():
-    """Enhanced chat message sending"""
+@app.route('/api/advocates/<advocate_id>/slots')
+@conditional(_table_version('meeting_bookings'))
+def get_advocate_slots(advocate_id):
+    """Free and taken meeting slots of an advocate on ?date=YYYY-MM-DD"""
     try:
-        data = request.get_json()
-        print(f"💬 Chat message: {data}")
-        
-        room = data.get('room', 'general')
-        sender = data.get('sender', 'Anonymous')
-        message = data.get('message', '').strip()
+        advocate = advocate_directory.get(advocate_id)
+        if advocate is None:
+            return jsonify({"status": "error", "message": "Advocate not found"}), 404
         
-        if not message:
-            return jsonify({"status": "error", "message": "Message cannot be empty"}), 400
+        try:
+            meeting_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').strftime('%Y-%m-%d')
+            duration = parse_duration(request.args.get('duration', '45'))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": f"Invalid date or duration: {e}"}), 400
         
-        if len(message) > 1000:
-            return jsonify({"status": "error", "message": "Message too long (max 1000 characters)"}), 400
+        busy = DayIntervals(db.get_advocate_bookings(advocate['name'], meeting_date))
+        slots = busy.slots(duration)
         
-        # Initialize chat room if not exists
-        if room not in chat_rooms:
-            chat_rooms[room] = []
+        return jsonify({
+            "status": "success",
+            "advocate_id": advocate_id,
+            "date": meeting_date,
+            "duration": duration,
+            "slots": slots,
+            "free": [slot['time'] for slot in slots if slot['available']]
+        })
         
-        # Create message object
-        message_obj = {
-            'id': str(uuid.uuid4()),
+    except Exception as e:
+        log.exception("Error fetching slots")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# ===== CHAT SYSTEM ROUTES =====
+
+def _deliver_local(message_obj):
+    """Cache a saved message and wake this worker's long-poll requests and stream subscribers"""
+    room = message_obj['room']
+    chat_rooms.append(room, message_obj)
+    chat_notifier.notify(room, message_obj['id'])
+    chat_broadcaster.publish(room, message_obj)
+
+def _deliver_message(message_obj):
+    """Deliver a saved message through the state backend (to every worker)"""
+    state.publish_chat(message_obj)
+
+def _deliver_committed(rows):
+    """Write-behind commit hook: deliver a committed batch in id order"""
+    for message_id, room, sender, message, timestamp in rows:
+        _deliver_message({
+            'id': message_id,
             'sender': sender,
             'message': message,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'room': room
-        }
-        
-        # Add to memory (keep last 100 messages per room)
-        chat_rooms[room].append(message_obj)
-        if len(chat_rooms[room]) > 100:
-            chat_rooms[room] = chat_rooms[room][-100:]
-        
-        # Save to database
+        })
+
+state.start(_deliver_local)
+
+# Optional group-commit persistence for chat messages
+if CHAT_WRITE_BEHIND:
+    db.enable_write_behind(on_commit=_deliver_committed)
+    chat_log.info("Chat write-behind enabled")
+
+def _send_chat_message(room, sender, message):
+    """Validate, save and deliver a chat message; returns (message_id, timestamp)
+
+    Shared by the REST route and the chat socket. Raises ValueError for an
+    empty or oversized message and db.WriteQueueFull when the write-behind
+    queue is saturated; message_id is None if the save failed.
+    """
+    message = (message or '').strip()
+    
+    if not message:
+        raise ValueError("Message cannot be empty")
+    
+    if len(message) > 1000:
+        raise ValueError("Message too long (max 1000 characters)")
+    
+    timestamp = datetime.now().isoformat()
+    
+    if db.write_behind_enabled():
+        # Waits for the group commit; the writer delivers the message
         message_id = db.save_chat_message(room, sender, message)
+    else:
+        # Save to database first so the message carries its cursor id.
+        # The lock keeps delivered ids ascending, so a "since" poller
+        # can never see id N+1 before id N.
+        with chat_lock_wait.time():
+            chat_write_lock.acquire()
+        try:
+            message_id = db.save_chat_message(room, sender, message)
+            
+            if message_id:
+                _deliver_message({
+                    'id': message_id,
+                    'sender': sender,
+                    'message': message,
+                    'timestamp': timestamp,
+                    'room': room
+                })
+        finally:
+            chat_write_lock.release()
+    
+    if message_id:
+        chat_log.info("Message sent", extra={'event': 'chat.message_sent', 'room': room, 'message_id': message_id})
+    return message_id, timestamp
+
+@app.route('/api/chat/send', methods=['POST'])
+def send_message():
+    """Enhanced chat message sending"""
+    try:
+        data = request.get_json()
+        
+        try:
+            message_id, timestamp = _send_chat_message(
+                data.get('room', 'general'), data.get('sender', 'Anonymous'), data.get('message', ''))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         
         if message_id:
-            message_obj['db_id'] = message_id
-            print(f"💾 Message saved: {sender} in {room}")
-            
             return jsonify({
                 "status": "success",
                 "message_id": message_id,
-                "timestamp": message_obj['timestamp']
+                "timestamp": timestamp
             })
         else:
             return jsonify({"status": "error", "message": "Failed to save message"}), 500
             
+    except db.WriteQueueFull as e:
+        chat_log.warning("Chat send rejected: %s", e, extra={'event': 'chat.send_rejected'})
+        return jsonify({"status": "error", "message": "Server busy, please retry"}), 503, {'Retry-After': '1'}
     except Exception as e:
-        print(f"❌ Chat send error: {e}")
+        chat_log.exception("Chat send error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _format_db_messages(db_messages):
+    """Convert chat_messages rows into API message dicts"""
+    return [{
+        'id': msg[0],
+        'sender': msg[2],
+        'message': msg[3],
+        'timestamp': msg[4],
+        'room': msg[1]
+    } for msg in db_messages]
+
+def _load_room_messages(room_id, limit):
+    """Chat room cache loader: the newest messages of a room from the database"""
+    return _format_db_messages(db.get_chat_messages(room_id, limit=limit))
+
+def _lags(messages, floor_id):
+    """True when cached messages are older than the room version the ETag promises"""
+    version = g.get('resource_version')
+    if version is None or len(messages) >= CHAT_PAGE_SIZE:
+        return False
+    return (messages[-1]['id'] if messages else floor_id) < version
+
+def _messages_since(room_id, since):
+    """Messages newer than the ``since`` cursor, from memory when it covers the gap"""
+    messages = chat_rooms.get_since(room_id, since, CHAT_PAGE_SIZE)
+    if messages is None or _lags(messages, since):
+        messages = _format_db_messages(db.get_chat_messages(room_id, limit=CHAT_PAGE_SIZE, since=since))
+    return messages
+
 @app.route('/api/chat/messages/<room_id>')
+@conditional(_room_version)
 def get_messages(room_id):
-    """Enhanced chat message retrieval"""
+    """Enhanced chat message retrieval
+
+    Query parameters:
+        since: only return messages with an id greater than this cursor
+        wait:  with ``since``, hold the request up to this many seconds
+               until a new message arrives (long-poll)
+        before: scrollback - the ``limit`` messages older than this id;
+                follow ``next_before`` for the page before that
+    """
     try:
-        # Get from memory first (faster)
-        if room_id in chat_rooms:
-            messages = chat_rooms[room_id][-50:]  # Last 50 messages
-        else:
-            messages = []
+        since = request.args.get('since', type=int)
+        wait = min(max(request.args.get('wait', 0, type=float), 0), LONG_POLL_MAX_WAIT)
+        before = request.args.get('before', type=int)
+        
+        if before is not None:
+            limit = min(max(request.args.get('limit', CHAT_PAGE_SIZE, type=int), 1), CHAT_SCROLLBACK_MAX)
+            # One extra row tells whether an older page exists
+            messages = _format_db_messages(db.get_chat_messages(room_id, limit=limit + 1, before=before))
+            has_more = len(messages) > limit
+            if has_more:
+                messages = messages[1:]
+            
+            return jsonify({
+                "status": "success",
+                "messages": messages,
+                "count": len(messages),
+                "next_before": messages[0]['id'] if has_more else None
+            })
         
-        # If no messages in memory, try database
-        if not messages:
-            try:
-                db_messages = db.get_chat_messages(room_id, limit=50)
-                messages = []
-                
-                for msg in db_messages:
-                    messages.append({
-                        'id': msg[0],
-                        'sender': msg[2],
-                        'message': msg[3],
-                        'timestamp': msg[4],
-                        'room': msg[1]
-                    })
-                
-                # Update memory
-                if room_id not in chat_rooms:
-                    chat_rooms[room_id] = []
-                chat_rooms[room_id] = messages
-                
-            except Exception as db_e:
-                print(f"⚠️ Database message fetch failed: {db_e}")
+        if since is not None:
+            messages = _messages_since(room_id, since)
+            
+            if not messages and wait > 0:
+                if chat_notifier.wait(room_id, since, wait):
+                    messages = _messages_since(room_id, since)
+            
+            return jsonify({
+                "status": "success",
+                "messages": messages,
+                "count": len(messages),
+                "last_id": messages[-1]['id'] if messages else since
+            })
+        
+        # Last 50 messages from memory, reading through to the database on a miss
+        try:
+            messages = chat_rooms.get_recent(room_id, CHAT_PAGE_SIZE, _load_room_messages)
+            if _lags(messages, 0):
+                # Committed but not yet delivered to the cache
+                messages = _load_room_messages(room_id, CHAT_PAGE_SIZE)
+        except Exception as db_e:
+            chat_log.warning("Database message fetch failed: %s", db_e)
+            messages = []
         
         return jsonify({
             "status": "success",
             "messages": messages,
-            "count": len(messages)
+            "count": len(messages),
+            "last_id": messages[-1]['id'] if messages else 0,
+            "next_before": messages[0]['id'] if len(messages) >= CHAT_PAGE_SIZE else None
         })
         
     except Exception as e:
-        print(f"❌ Get messages error: {e}")
+        chat_log.exception("Get messages error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _sse_event(message):
+    """Format a chat message as a Server-Sent Event keyed by its database id"""
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+
+@app.route('/api/chat/stream/<room_id>')
+def stream_messages(room_id):
+    """Server-Sent Events stream of new chat messages for a room
+
+    Resumes after the ``Last-Event-ID`` header (sent automatically by
+    EventSource on reconnect) or the ``since`` query parameter.
+    """
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('since', type=int)
+    
+    def generate():
+        # Subscribe before replaying so nothing falls between the two
+        subscription = chat_broadcaster.subscribe(room_id)
+        sent_id = last_id or 0
+        try:
+            yield "retry: 3000\n\n"
+            
+            # Replay anything missed since the client's last event
+            if last_id is not None:
+                while True:
+                    backlog = _format_db_messages(
+                        db.get_chat_messages(room_id, limit=CHAT_PAGE_SIZE, since=sent_id)
+                    )
+                    for message in backlog:
+                        sent_id = message['id']
+                        yield _sse_event(message)
+                    if len(backlog) < CHAT_PAGE_SIZE:
+                        break
+            
+            deadline = time.monotonic() + STREAM_MAX_DURATION
+            while time.monotonic() < deadline and not subscription.dropped:
+                message = subscription.get(timeout=STREAM_HEARTBEAT_INTERVAL)
+                if message is None:
+                    yield ": heartbeat\n\n"
+                elif message['id'] > sent_id:
+                    sent_id = message['id']
+                    yield _sse_event(message)
+        finally:
+            chat_broadcaster.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 # ===== WEBRTC SIGNALING ROUTES =====
 
 @app.route('/api/webrtc/join/<room_id>', methods=['POST'])
@@ -545,130 +995,104 @@ def join_webrtc_room(room_id):
         data = request.get_json()
         username = data.get('username', 'Anonymous')
         
-        print(f"🎥 WebRTC join request: {username} -> {room_id}")
-        
-        # Initialize room if not exists
-        if room_id not in webrtc_rooms:
-            webrtc_rooms[room_id] = {
-                'users': [],
-                'signals': [],
-                'created_at': datetime.now().isoformat()
-            }
+        # Rejoining under the same name refreshes the existing entry.
+        # Prefer the client's own id so signal "to"/"from" fields match it
+        user_id, joined = webrtc_rooms.join(room_id, username, data.get('user_id') or str(uuid.uuid4()))
         
-        # Check if user already in room
-        existing_user = next((u for u in webrtc_rooms[room_id]['users'] if u['username'] == username), None)
-        
-        if existing_user:
-            print(f"🔄 User {username} already in room, updating...")
-            existing_user['last_seen'] = datetime.now().isoformat()
-            user_id = existing_user['id']
-        else:
-            # Add new user to room
-            user_data = {
-                'id': str(uuid.uuid4()),
-                'username': username,
-                'joined_at': datetime.now().isoformat(),
-                'last_seen': datetime.now().isoformat(),
-                'status': 'connected'
-            }
-            
-            webrtc_rooms[room_id]['users'].append(user_data)
-            user_id = user_data['id']
-            
-            print(f"✅ New user {username} joined WebRTC room {room_id}")
+        if joined:
+            webrtc_log.info("User joined room", extra={'event': 'webrtc.join', 'user_id': user_id})
+            # Connected sockets refresh their participant list
+            signal_broadcaster.publish(room_id, 0)
         
+        users = webrtc_rooms.users(room_id)
         return jsonify({
             "status": "success",
             "user_id": user_id,
             "room_id": room_id,
-            "users": webrtc_rooms[room_id]['users'],
-            "user_count": len(webrtc_rooms[room_id]['users'])
+            "users": users,
+            "user_count": len(users)
         })
         
     except Exception as e:
-        print(f"❌ WebRTC join error: {e}")
+        webrtc_log.exception("WebRTC join error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/webrtc/signals/<room_id>')
 def get_webrtc_signals(room_id):
-    """Enhanced WebRTC signaling message retrieval"""
+    """Enhanced WebRTC signaling message retrieval
+
+    Query parameters:
+        user:  the polling user's id; only signals addressed to this user
+               or broadcast by someone else are returned
+        after: sequence number of the last signal already handled; it is
+               acknowledged and only newer signals are returned
+    """
     try:
-        if room_id not in webrtc_rooms:
+        if not webrtc_rooms.has_room(room_id):
             return jsonify({
                 "status": "success",
                 "signals": [],
+                "last_seq": 0,
                 "users": [],
                 "user_count": 0
             })
         
-        room = webrtc_rooms[room_id]
-        signals = room.get('signals', [])
-        
-        # Clean old signals (keep only last 20)
-        if len(signals) > 20:
-            room['signals'] = signals[-20:]
-            signals = room['signals']
-        
-        # Clean old users (remove inactive users after 30 seconds)
-        current_time = datetime.now()
-        active_users = []
+        user_id = request.args.get('user')
+        after = request.args.get('after', 0, type=int)
         
-        for user in room.get('users', []):
-            try:
-                last_seen = datetime.fromisoformat(user.get('last_seen', user.get('joined_at')))
-                if (current_time - last_seen).total_seconds() < 30:
-                    active_users.append(user)
-                else:
-                    print(f"🚶 Removing inactive user: {user['username']}")
-            except:
-                active_users.append(user)  # Keep if timestamp parsing fails
+        if user_id:
+            # Polling is the heartbeat; idle users are expired in the background
+            webrtc_rooms.heartbeat(room_id, user_id)
+            signals, last_seq = signal_store.fetch(room_id, user_id, after)
+        else:
+            # Legacy pollers without a user id get the newest room signals
+            signals = signal_store.recent(room_id, limit=20)
+            last_seq = signals[-1]['seq'] if signals else after
         
-        room['users'] = active_users
+        active_users = webrtc_rooms.users(room_id)
+        webrtc_log.debug("Signal poll", extra={'event': 'webrtc.signal_poll', 'count': len(signals)})
         
         return jsonify({
             "status": "success",
             "signals": signals,
+            "last_seq": last_seq,
             "users": active_users,
             "user_count": len(active_users)
         })
         
     except Exception as e:
-        print(f"❌ WebRTC signals error: {e}")
+        webrtc_log.exception("WebRTC signals error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def _send_signal(room_id, data):
+    """Store a client's signal (REST or socket payload); returns (signal_id, seq)"""
+    signal = {
+        'id': str(uuid.uuid4()),
+        'from': data.get('from', 'anonymous'),
+        'to': data.get('to'),
+        'type': data.get('type'),
+        'data': data.get('data'),
+        'timestamp': datetime.now().isoformat()
+    }
+    
+    # Add signal to the recipient's mailbox
+    seq = _store_signal(room_id, signal)
+    # Track the room (after posting) so its signals expire with it
+    webrtc_rooms.touch(room_id)
+    
+    webrtc_log.debug("Signal stored", extra={'event': 'webrtc.signal_stored', 'type': signal['type'], 'seq': seq})
+    return signal['id'], seq
+
 @app.route('/api/webrtc/signal/<room_id>', methods=['POST'])
 def send_webrtc_signal(room_id):
     """Enhanced WebRTC signaling message sending"""
     try:
-        data = request.get_json()
-        print(f"📡 WebRTC signal received: {data.get('type')} in room {room_id}")
-        
-        if room_id not in webrtc_rooms:
-            webrtc_rooms[room_id] = {
-                'users': [],
-                'signals': [],
-                'created_at': datetime.now().isoformat()
-            }
-        
-        # Create signal object
-        signal = {
-            'id': str(uuid.uuid4()),
-            'from': data.get('from', 'anonymous'),
-            'to': data.get('to'),
-            'type': data.get('type'),
-            'data': data.get('data'),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        # Add signal to room
-        webrtc_rooms[room_id]['signals'].append(signal)
+        signal_id, seq = _send_signal(room_id, request.get_json())
         
-        print(f"✅ WebRTC signal stored: {signal['type']} from {signal['from']}")
-        
-        return jsonify({"status": "success", "signal_id": signal['id']})
+        return jsonify({"status": "success", "signal_id": signal_id, "seq": seq})
         
     except Exception as e:
-        print(f"❌ WebRTC signal error: {e}")
+        webrtc_log.exception("WebRTC signal error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/webrtc/leave/<room_id>', methods=['POST'])
@@ -678,72 +1102,253 @@ def leave_webrtc_room(room_id):
         data = request.get_json()
         user_id = data.get('user_id')
         
-        if room_id in webrtc_rooms and user_id:
-            users = webrtc_rooms[room_id]['users']
-            webrtc_rooms[room_id]['users'] = [u for u in users if u['id'] != user_id]
-            
-            print(f"👋 User {user_id} left WebRTC room {room_id}")
+        if user_id and webrtc_rooms.leave(room_id, user_id):
+            webrtc_log.info("User left room", extra={'event': 'webrtc.leave', 'user_id': user_id})
             
             # Add leave signal for other users
-            leave_signal = {
-                'id': str(uuid.uuid4()),
-                'from': user_id,
-                'to': None,
-                'type': 'user-left',
-                'data': {'user_id': user_id},
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            webrtc_rooms[room_id]['signals'].append(leave_signal)
+            _post_user_left(room_id, user_id)
         
         return jsonify({"status": "success"})
         
     except Exception as e:
-        print(f"❌ WebRTC leave error: {e}")
+        webrtc_log.exception("WebRTC leave error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# ===== WEBSOCKET TRANSPORT =====
+# /ws/chat/<room> and /ws/webrtc/<room> carry the REST payloads tagged with
+# an "event" field. Client frames are handled on a reader thread; every
+# outgoing frame goes through the connection's bounded subscription queue
+# and is written by the handler thread, so a client that stops reading is
+# dropped (and reconnects with its cursor) instead of buffering forever.
+
+def _socket_reader(ws, subscription, handle_frame):
+    """Handle client frames until the socket closes, queueing the replies"""
+    try:
+        while not subscription.dropped:
+            text = ws.receive()
+            if text is None:
+                continue
+            frame = None
+            try:
+                try:
+                    frame = json.loads(text)
+                except ValueError:
+                    frame = None
+                if not isinstance(frame, dict):
+                    raise ValueError("Expected a JSON object")
+                reply = handle_frame(frame)
+            except ValueError as e:
+                reply = {"event": "error", "status": "error", "message": str(e)}
+            except db.WriteQueueFull:
+                reply = {"event": "error", "status": "error", "message": "Server busy, please retry"}
+            except Exception as e:
+                log.exception("Socket frame error")
+                reply = {"event": "error", "status": "error", "message": str(e)}
+            if reply is not None:
+                if isinstance(frame, dict) and 'ref' in frame:
+                    reply['ref'] = frame['ref']
+                subscription.queue.put_nowait(('reply', reply))
+    except queue.Full:
+        subscription.dropped = True
+    except Exception:
+        pass  # connection closed
+    finally:
+        try:
+            subscription.queue.put_nowait(('closed', None))
+        except queue.Full:
+            subscription.dropped = True
+
+def _run_socket(ws, subscription, handle_frame, handle_item, idle_interval):
+    """Pump one socket: replies and ``handle_item(published item or None)`` frames"""
+    # Copy the request context so reader-thread logs keep request_id and room
+    reader = threading.Thread(target=contextvars.copy_context().run,
+                              args=(_socket_reader, ws, subscription, handle_frame), daemon=True)
+    reader.start()
+    while not subscription.dropped:
+        item = subscription.get(timeout=idle_interval)
+        if isinstance(item, tuple):
+            kind, frame = item
+            if kind == 'closed':
+                return
+            frames = [frame]
+        else:
+            frames = handle_item(item)
+        for frame in frames:
+            ws.send(json.dumps(frame))
+    ws.close(1013, 'Client too slow, reconnect')
+
+def chat_socket(ws, room_id):
+    """Chat room over a WebSocket
+
+    Pushes {"event": "message", "message": {...}} for every new message,
+    after replaying those newer than the ``since`` query parameter.
+    Accepts {"event": "send", "sender", "message"} (the /api/chat/send
+    body) and answers {"event": "sent", ...} with the REST response.
+    """
+    since = request.args.get('since', type=int)
+    # Subscribe before replaying so nothing falls between the two
+    subscription = chat_broadcaster.subscribe(room_id)
+    sent = {'id': since or 0}
+
+    def handle_frame(frame):
+        event = frame.get('event')
+        if event == 'ping':
+            return {"event": "pong"}
+        if event != 'send':
+            raise ValueError(f"Unknown event: {event}")
+        message_id, timestamp = _send_chat_message(room_id, frame.get('sender', 'Anonymous'), frame.get('message', ''))
+        if not message_id:
+            return {"event": "sent", "status": "error", "message": "Failed to save message"}
+        return {"event": "sent", "status": "success", "message_id": message_id, "timestamp": timestamp}
+
+    def handle_item(message):
+        if message is None or message['id'] <= sent['id']:
+            return []
+        sent['id'] = message['id']
+        return [{"event": "message", "message": message}]
+
+    try:
+        if since is not None:
+            while True:
+                backlog = _format_db_messages(
+                    db.get_chat_messages(room_id, limit=CHAT_PAGE_SIZE, since=sent['id'])
+                )
+                for message in backlog:
+                    ws.send(json.dumps(handle_item(message)[0]))
+                if len(backlog) < CHAT_PAGE_SIZE:
+                    break
+
+        _run_socket(ws, subscription, handle_frame, handle_item, STREAM_HEARTBEAT_INTERVAL)
+    finally:
+        chat_broadcaster.unsubscribe(subscription)
+
+def webrtc_socket(ws, room_id):
+    """WebRTC signaling over a WebSocket
+
+    Query parameters ``user`` and ``after`` as for /api/webrtc/signals.
+    Pushes {"event": "signals", ...} (the polling response) whenever the
+    user has new signals or the participant list changes, and accepts
+    {"event": "signal", "to", "type", "data"} (the /api/webrtc/signal
+    body), answered with {"event": "signal_ack", ...}. An open socket
+    keeps the user's presence alive.
+    """
+    user_id = request.args.get('user')
+    if not user_id:
+        ws.close(1008, 'user is required')
+        return
+
+    cursor = {'after': request.args.get('after', 0, type=int), 'users': None}
+    subscription = signal_broadcaster.subscribe(room_id)
+
+    def handle_frame(frame):
+        event = frame.get('event')
+        if event == 'ping':
+            return {"event": "pong"}
+        if event != 'signal':
+            raise ValueError(f"Unknown event: {event}")
+        signal_id, seq = _send_signal(room_id, {**frame, 'from': frame.get('from', user_id)})
+        return {"event": "signal_ack", "status": "success", "signal_id": signal_id, "seq": seq}
+
+    def handle_item(_):
+        # Any wake-up or idle tick: heartbeat, then push what changed
+        webrtc_rooms.heartbeat(room_id, user_id)
+        signals, last_seq = signal_store.fetch(room_id, user_id, cursor['after'])
+        users = webrtc_rooms.users(room_id)
+        user_ids = [user['id'] for user in users]
+        if not signals and user_ids == cursor['users']:
+            return []
+        cursor['after'], cursor['users'] = last_seq, user_ids
+        return [{
+            "event": "signals",
+            "status": "success",
+            "signals": signals,
+            "last_seq": last_seq,
+            "users": users,
+            "user_count": len(users)
+        }]
+
+    try:
+        # Signals posted by other workers don't wake this one; poll for them
+        idle_interval = state.poll_interval or WS_IDLE_INTERVAL
+        subscription.queue.put_nowait(0)  # send the current state first
+        _run_socket(ws, subscription, handle_frame, handle_item, idle_interval)
+    finally:
+        signal_broadcaster.unsubscribe(subscription)
+
+if sock is not None:
+    sock.route('/ws/chat/<room_id>')(chat_socket)
+    sock.route('/ws/webrtc/<room_id>')(webrtc_socket)
+
 # ===== SECURED ADMIN API ROUTES =====
 
+def _flag(name):
+    """True when a query-string flag is set (1/true/yes)"""
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
 @app.route('/api/admin/meetings')
 @admin_required
+@conditional(_table_version('meeting_bookings'))
 def get_all_meetings():
-    """Enhanced admin meetings retrieval"""
+    """Enhanced admin meetings retrieval
+
+    Without query parameters every meeting is returned. Any of status,
+    advocate_name, urgency_level, case_type, date_from, date_to, sort
+    (created_at, meeting_date, id), order, cursor, limit or include_total
+    switches to keyset pagination; follow ``next_cursor`` for more pages.
+    """
     try:
-        print("📊 Admin: Fetching all meetings...")
-        
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, client_name, client_email, client_phone, client_city,
-                   advocate_name, meeting_date, meeting_time, meeting_type, meeting_duration,
-                   case_type, case_description, urgency_level, status, created_at
-            FROM meeting_bookings 
-            ORDER BY created_at DESC
-        ''')
-        
-        meetings = []
-        for row in cursor.fetchall():
-            meetings.append({
-                'id': row[0],
-                'client_name': row[1],
-                'client_email': row[2], 
-                'client_phone': row[3],
-                'client_city': row[4],
-                'advocate_name': row[5],
-                'meeting_date': row[6],
-                'meeting_time': row[7],
-                'meeting_type': row[8],
-                'meeting_duration': row[9],
-                'case_type': row[10],
-                'case_description': row[11],
-                'urgency_level': row[12],
-                'status': row[13],
-                'created_at': row[14]
+        if request.args:
+            meetings, next_cursor, total = db.get_meetings_page(
+                filters={key: request.args.get(key) for key in db.MEETING_FILTERS},
+                date_from=request.args.get('date_from'),
+                date_to=request.args.get('date_to'),
+                sort=request.args.get('sort', 'created_at'),
+                order=request.args.get('order', 'desc'),
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', 50, type=int),
+                include_total=_flag('include_total')
+            )
+            return jsonify({
+                "status": "success",
+                "meetings": meetings,
+                "count": len(meetings),
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+                "total": total
             })
         
-        conn.close()
-        print(f"✅ Admin: Retrieved {len(meetings)} meetings")
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, client_name, client_email, client_phone, client_city,
+                       advocate_name, meeting_date, meeting_time, meeting_type, meeting_duration,
+                       case_type, case_description, urgency_level, status, created_at
+                FROM meeting_bookings 
+                ORDER BY created_at DESC
+            ''')
+            
+            meetings = []
+            for row in cursor.fetchall():
+                meetings.append({
+                    'id': row[0],
+                    'client_name': row[1],
+                    'client_email': row[2], 
+                    'client_phone': row[3],
+                    'client_city': row[4],
+                    'advocate_name': row[5],
+                    'meeting_date': row[6],
+                    'meeting_time': row[7],
+                    'meeting_type': row[8],
+                    'meeting_duration': row[9],
+                    'case_type': row[10],
+                    'case_description': row[11],
+                    'urgency_level': row[12],
+                    'status': row[13],
+                    'created_at': row[14]
+                })
+        
+        admin_log.debug("Retrieved all meetings", extra={'event': 'admin.meetings', 'count': len(meetings)})
         
         return jsonify({
             "status": "success",
@@ -751,39 +1356,64 @@ def get_all_meetings():
             "count": len(meetings)
         })
         
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
-        print(f"❌ Admin meetings error: {e}")
+        admin_log.exception("Admin meetings error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/admin/clients')
 @admin_required
+@conditional(_table_version('clients'))
 def get_all_clients():
-    """Enhanced admin clients retrieval"""
+    """Enhanced admin clients retrieval
+
+    Without query parameters every client is returned. Any of city,
+    date_from, date_to, sort (registered_at, name, id), order, cursor,
+    limit or include_total switches to keyset pagination.
+    """
     try:
-        print("📊 Admin: Fetching all clients...")
-        
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, name, phone, city, email, registered_at
-            FROM clients 
-            ORDER BY registered_at DESC
-        ''')
-        
-        clients = []
-        for row in cursor.fetchall():
-            clients.append({
-                'id': row[0],
-                'name': row[1],
-                'phone': row[2],
-                'city': row[3], 
-                'email': row[4],
-                'registered_at': row[5]
+        if request.args:
+            clients, next_cursor, total = db.get_clients_page(
+                filters={key: request.args.get(key) for key in db.CLIENT_FILTERS},
+                date_from=request.args.get('date_from'),
+                date_to=request.args.get('date_to'),
+                sort=request.args.get('sort', 'registered_at'),
+                order=request.args.get('order', 'desc'),
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', 50, type=int),
+                include_total=_flag('include_total')
+            )
+            return jsonify({
+                "status": "success",
+                "clients": clients,
+                "count": len(clients),
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+                "total": total
             })
         
-        conn.close()
-        print(f"✅ Admin: Retrieved {len(clients)} clients")
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, name, phone, city, email, registered_at
+                FROM clients 
+                ORDER BY registered_at DESC
+            ''')
+            
+            clients = []
+            for row in cursor.fetchall():
+                clients.append({
+                    'id': row[0],
+                    'name': row[1],
+                    'phone': row[2],
+                    'city': row[3], 
+                    'email': row[4],
+                    'registered_at': row[5]
+                })
+        
+        admin_log.debug("Retrieved all clients", extra={'event': 'admin.clients', 'count': len(clients)})
         
         return jsonify({
             "status": "success",
@@ -791,58 +1421,181 @@ def get_all_clients():
             "count": len(clients)
         })
         
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
-        print(f"❌ Admin clients error: {e}")
+        admin_log.exception("Admin clients error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/api/admin/stats')
+# ===== FULL-TEXT SEARCH =====
+SEARCH_TYPES = {'all': ('chat', 'meeting'), 'chat': ('chat',), 'meetings': ('meeting',)}
+
+def _highlight(snippet):
+    """HTML-escape a search snippet, then mark the matched terms"""
+    return (html.escape(snippet or '')
+            .replace(db.HIGHLIGHT_START, '<mark>')
+            .replace(db.HIGHLIGHT_END, '</mark>'))
+
+@app.route('/api/admin/search')
 @admin_required
-def get_admin_stats():
-    """Enhanced admin statistics"""
+def admin_search():
+    """Ranked full-text search over chat messages and case descriptions
+
+    q is required; type (all, chat, meetings), room, advocate, date_from,
+    date_to, limit and offset narrow and page the results.
+    """
     try:
-        print("📈 Admin: Fetching statistics...")
-        
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        # Get comprehensive stats
-        cursor.execute("SELECT COUNT(*) FROM clients")
-        total_clients = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings")
-        total_meetings = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings WHERE status = 'pending'")
-        pending_meetings = cursor.fetchone()[0]
+        kinds = SEARCH_TYPES.get(request.args.get('type', 'all'))
+        if kinds is None:
+            raise ValueError(f"type must be one of: {', '.join(SEARCH_TYPES)}")
+        offset = request.args.get('offset', 0, type=int)
+        
+        results, has_more = db.search_all(
+            request.args.get('q', ''),
+            kinds=kinds,
+            room=request.args.get('room'),
+            advocate_name=request.args.get('advocate'),
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to'),
+            limit=request.args.get('limit', 20, type=int),
+            offset=offset
+        )
+        for result in results:
+            result['snippet'] = _highlight(result['snippet'])
+            result['rank'] = round(result['rank'], 4)
         
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings WHERE status = 'confirmed'")  
-        confirmed_meetings = cursor.fetchone()[0]
+        return jsonify({
+            "status": "success",
+            "results": results,
+            "count": len(results),
+            "next_offset": offset + len(results) if has_more else None,
+            "has_more": has_more,
+            "backfill_pending": db.get_search_backfill_status()['pending']
+        })
         
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings WHERE date(meeting_date) = date('now')")
-        today_meetings = cursor.fetchone()[0]
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        admin_log.exception("Admin search error")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# ===== STREAMING EXPORTS =====
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+def _export_args():
+    """Format and selected columns of an export request (ValueError if invalid)"""
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    columns = [c.strip() for c in request.args.get('columns', '').split(',') if c.strip()]
+    return export_format, columns
+
+def _export_response(export_format, columns, rows, name):
+    """Stream rows as CSV or NDJSON, flushing roughly every 64 KiB"""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == 'csv' else None
+        if writer:
+            writer.writerow(columns)
+        for row in rows:
+            if writer:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n')
+            if buffer.tell() >= EXPORT_FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    response = Response(generate(), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/api/admin/export/meetings')
+@admin_required
+def export_meetings():
+    """Stream meetings as CSV or NDJSON
+
+    Supports format, columns (comma-separated), date_from/date_to on
+    meeting_date and the admin list filters.
+    """
+    try:
+        export_format, columns = _export_args()
+        columns, rows = db.export_meetings(
+            columns=columns,
+            filters={key: request.args.get(key) for key in db.MEETING_FILTERS},
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to')
+        )
+        admin_log.info("Exporting meetings", extra={'event': 'admin.export', 'table': 'meetings', 'format': export_format})
+        return _export_response(export_format, columns, rows, 'meetings')
         
-        cursor.execute("SELECT COUNT(*) FROM chat_messages")
-        total_messages = cursor.fetchone()[0]
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        admin_log.exception("Meetings export error")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/admin/export/clients')
+@admin_required
+def export_clients():
+    """Stream clients as CSV or NDJSON (date range applies to registered_at)"""
+    try:
+        export_format, columns = _export_args()
+        columns, rows = db.export_clients(
+            columns=columns,
+            filters={key: request.args.get(key) for key in db.CLIENT_FILTERS},
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to')
+        )
+        admin_log.info("Exporting clients", extra={'event': 'admin.export', 'table': 'clients', 'format': export_format})
+        return _export_response(export_format, columns, rows, 'clients')
         
-        # Get recent activity counts
-        cursor.execute("SELECT COUNT(*) FROM clients WHERE date(registered_at) = date('now')")
-        today_clients = cursor.fetchone()[0]
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        admin_log.exception("Clients export error")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/admin/export/chat/<room_id>')
+@admin_required
+def export_chat(room_id):
+    """Stream a chat room's full history as CSV or NDJSON"""
+    try:
+        export_format, columns = _export_args()
+        columns, rows = db.export_chat_messages(
+            room_id,
+            columns=columns,
+            date_from=request.args.get('date_from'),
+            date_to=request.args.get('date_to')
+        )
+        admin_log.info("Exporting chat room", extra={'event': 'admin.export', 'table': 'chat', 'format': export_format})
+        return _export_response(export_format, columns, rows, f'chat-{room_id}')
         
-        conn.close()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        admin_log.exception("Chat export error")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/admin/stats')
+@admin_required
+@conditional(_admin_stats_version)
+def get_admin_stats():
+    """Enhanced admin statistics"""
+    try:
+        # Counters are maintained by database triggers - one indexed lookup
+        stats = db.get_database_stats()
         
-        stats = {
-            'total_clients': total_clients,
-            'total_meetings': total_meetings,
-            'pending_meetings': pending_meetings,
-            'confirmed_meetings': confirmed_meetings,
-            'today_meetings': today_meetings,
-            'total_messages': total_messages,
-            'today_clients': today_clients,
+        stats.update({
             'active_webrtc_rooms': len(webrtc_rooms),
             'active_chat_rooms': len(chat_rooms)
-        }
-        
-        print(f"✅ Admin: Statistics compiled - {total_meetings} meetings, {total_clients} clients")
+        })
         
         return jsonify({
             "status": "success",
@@ -850,40 +1603,41 @@ def get_admin_stats():
         })
         
     except Exception as e:
-        print(f"❌ Admin stats error: {e}")
+        admin_log.exception("Admin stats error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# Largest /api/admin/meetings/bulk-status request (one transaction)
+MEETING_BULK_MAX = 500
+
+def _set_meeting_status(meeting_id, status, event, done_message):
+    """Single-meeting status change through the validated bulk path"""
+    result = db.update_meeting_statuses([meeting_id], status)[0]
+    
+    if result['result'] == 'not_found':
+        return jsonify({"status": "error", "message": "Meeting not found"}), 404
+    if result['result'] == 'invalid_transition':
+        return jsonify({
+            "status": "error",
+            "message": f"Cannot change a {result['previous_status']} meeting to {status}"
+        }), 409
+    
+    if result['result'] == 'updated':
+        admin_log.info(done_message, extra={'event': event, 'meeting_id': meeting_id})
+    
+    return jsonify({
+        "status": "success",
+        "message": f"{done_message} successfully"
+    })
+
 @app.route('/api/admin/meetings/<int:meeting_id>/confirm', methods=['POST'])
 @admin_required
 def confirm_meeting(meeting_id):
     """Enhanced meeting confirmation"""
     try:
-        print(f"✅ Admin: Confirming meeting {meeting_id}")
-        
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "UPDATE meeting_bookings SET status = 'confirmed' WHERE id = ?",
-            (meeting_id,)
-        )
-        
-        if cursor.rowcount > 0:
-            conn.commit()
-            conn.close()
-            
-            print(f"✅ Meeting {meeting_id} confirmed successfully")
-            
-            return jsonify({
-                "status": "success", 
-                "message": "Meeting confirmed successfully"
-            })
-        else:
-            conn.close()
-            return jsonify({"status": "error", "message": "Meeting not found"}), 404
+        return _set_meeting_status(meeting_id, 'confirmed', 'meeting.confirmed', "Meeting confirmed")
             
     except Exception as e:
-        print(f"❌ Confirm meeting error: {e}")
+        admin_log.exception("Confirm meeting error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/admin/meetings/<int:meeting_id>/cancel', methods=['POST'])
@@ -891,32 +1645,50 @@ def confirm_meeting(meeting_id):
 def cancel_meeting(meeting_id):
     """Enhanced meeting cancellation"""
     try:
-        print(f"❌ Admin: Cancelling meeting {meeting_id}")
+        return _set_meeting_status(meeting_id, 'cancelled', 'meeting.cancelled', "Meeting cancelled")
+            
+    except Exception as e:
+        admin_log.exception("Cancel meeting error")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/admin/meetings/bulk-status', methods=['POST'])
+@admin_required
+def bulk_meeting_status():
+    """Change the status of many meetings in one transaction
+
+    Body: {"ids": [1, 2, ...], "status": "confirmed"}. Each id gets a
+    result: updated, unchanged, not_found or invalid_transition (see
+    db.MEETING_STATUS_TRANSITIONS); only valid changes are applied.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        ids = data.get('ids')
+        status = data.get('status')
         
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return jsonify({"status": "error", "message": "ids must be a non-empty list of meeting ids"}), 400
+        if len(ids) > MEETING_BULK_MAX:
+            return jsonify({"status": "error", "message": f"At most {MEETING_BULK_MAX} meetings per request"}), 400
         
-        cursor.execute(
-            "UPDATE meeting_bookings SET status = 'cancelled' WHERE id = ?",
-            (meeting_id,)
-        )
+        try:
+            results = db.update_meeting_statuses(ids, status)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        outcomes = [r['result'] for r in results]
+        counts = {outcome: outcomes.count(outcome)
+                  for outcome in ('updated', 'unchanged', 'not_found', 'invalid_transition')}
+        admin_log.info("Bulk meeting status change", extra={
+            'event': 'meeting.bulk_status',
+            'target_status': status,
+            'updated_count': counts['updated'],
+            'requested': len(results)
+        })
+        
+        return jsonify({"status": "success", "target_status": status, "results": results, "counts": counts})
         
-        if cursor.rowcount > 0:
-            conn.commit()
-            conn.close()
-            
-            print(f"❌ Meeting {meeting_id} cancelled successfully")
-            
-            return jsonify({
-                "status": "success",
-                "message": "Meeting cancelled successfully"
-            })
-        else:
-            conn.close()
-            return jsonify({"status": "error", "message": "Meeting not found"}), 404
-            
     except Exception as e:
-        print(f"❌ Cancel meeting error: {e}")
+        admin_log.exception("Bulk meeting status error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # ===== ERROR HANDLERS =====
@@ -934,7 +1706,7 @@ def not_found(error):
 @app.errorhandler(500)
 def internal_error(error):
     """Enhanced 500 error handler"""
-    print(f"❌ Internal server error: {error}")
+    log.error("Internal server error: %s", error)
     return jsonify({
         "status": "error", 
         "code": 500,
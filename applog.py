@@ -0,0 +1,163 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Root of every application logger (advocate.app, advocate.database, ...)
+ROOT_LOGGER = 'advocate'
+
+# LOG_LEVEL sets the default; LOG_LEVELS overrides per module,
+# e.g. "database=WARNING,webrtc=DEBUG"
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.environ.get('LOG_LEVELS', '')
+
+# Keep 1 in N records of high-volume events, e.g. "chat.message_saved=100"
+DEFAULT_SAMPLE_RATES = {
+    'chat.message_saved': 100,
+    'chat.message_sent': 100,
+    'webrtc.signal_stored': 50,
+    'webrtc.signal_poll': 1000,
+}
+LOG_SAMPLE = os.environ.get('LOG_SAMPLE', '')
+
+LOG_QUEUE_SIZE = 10000
+
+# Per-request context, set by the web layer and stamped onto every record
+request_id_var = contextvars.ContextVar('request_id', default=None)
+room_var = contextvars.ContextVar('room', default=None)
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+def _parse_pairs(text):
+    pairs = {}
+    for item in text.split(','):
+        key, _, value = item.partition('=')
+        if key.strip() and value.strip():
+            pairs[key.strip()] = value.strip()
+    return pairs
+
+class ContextFilter(logging.Filter):
+    """Stamp the current request id and room onto each record"""
+
+    def filter(self, record):
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = request_id_var.get()
+        if getattr(record, 'room', None) is None:
+            record.room = room_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Pass 1 in N records per sampled ``event``; warnings and errors always pass"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        rate = self.rates.get(getattr(record, 'event', None))
+        if not rate or rate <= 1 or record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            count = self._counts.get(record.event, 0)
+            self._counts[record.event] = count + 1
+        if count % rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the record's context and extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue without blocking; drop the record if the writer has fallen behind"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Format exceptions now (the traceback won't survive the queue), but
+        # leave the message and extra fields for the JSON formatter
+        record = logging.makeLogRecord(vars(record))
+        if record.exc_info:
+            record.exc = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _QueueHandler.dropped += 1
+
+_listener = None
+_configure_lock = threading.Lock()
+
+def configure_logging(stream=None):
+    """Route application logs through a background QueueListener (idempotent)"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = _QueueHandler(log_queue)
+        # Sample first so dropped records skip the rest of the work
+        handler.addFilter(SamplingFilter({**DEFAULT_SAMPLE_RATES,
+                                          **{k: int(v) for k, v in _parse_pairs(LOG_SAMPLE).items()}}))
+        handler.addFilter(ContextFilter())
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        for old in [h for h in root.handlers if isinstance(h, _QueueHandler)]:
+            root.removeHandler(old)
+        root.addHandler(handler)
+        root.propagate = False
+        for module, level in _parse_pairs(LOG_LEVELS).items():
+            logging.getLogger(f'{ROOT_LOGGER}.{module}').setLevel(level.upper())
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def get_logger(name):
+    """Logger for one module, e.g. get_logger('database') -> advocate.database"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+def get_logging_stats():
+    return {'dropped': _QueueHandler.dropped, 'running': _listener is not None}
@@ -0,0 +1,463 @@
+"""Load test for the chat, signaling, booking and admin endpoints
+
+Drives the real Flask app, in-process through its test client against a
+throwaway database (default) or over HTTP against a running server with
+``--url``. Each scenario runs on ``--concurrency`` threads and reports
+p50/p95/p99 latency, requests/s and SQLite busy errors per endpoint.
+
+    python benchmark.py --concurrency 8 --duration 10 --output results.json
+    python benchmark.py --baseline results.json      # exits 1 on a regression
+    python benchmark.py --url http://127.0.0.1:5000 --scenarios chat,webrtc
+
+Point ``--url`` at a scratch instance: the run books meetings and posts
+chat messages.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import date, datetime, timedelta
+from itertools import count
+
+SCENARIOS = ('chat', 'webrtc', 'booking', 'admin')
+
+# Response bodies that mean SQLite gave up waiting for a lock
+BUSY_MARKERS = (b'database is locked', b'database table is locked', b'database is busy')
+
+# Same defaults as app.py; override for a deployed server
+ADMIN_USERNAME = os.environ.get('BENCH_ADMIN_USERNAME', 'admin')
+ADMIN_PASSWORD = os.environ.get('BENCH_ADMIN_PASSWORD', 'easelaw@admin')
+
+# Booking slots used by the load test; 30 minutes so neighbours never overlap
+BOOKING_TIMES = ('09:00', '09:30', '10:00', '10:30', '11:00', '11:30',
+                 '14:00', '14:30', '15:00', '15:30', '16:00', '16:30')
+BOOKING_DURATION = '30'
+
+# ===== CLIENTS =====
+
+class LocalClient:
+    """Flask test client for one worker"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json_body=None, form=None):
+        response = self.client.open(path, method=method, json=json_body, data=form)
+        return response.status_code, response.get_data()
+
+class HttpClient:
+    """urllib client with its own cookie jar (the admin session)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, json_body=None, form=None):
+        headers = {}
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except OSError as e:
+            return 0, str(e).encode()
+
+def local_app(db_path=None):
+    """Import the app against a throwaway database (or ``db_path``)"""
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    import database as db
+    db.DB_PATH = db_path or os.path.join(tempfile.mkdtemp(prefix='advocate-bench-'), 'bench.db')
+    import app as app_module
+    app_module.app.config['TESTING'] = True
+    return app_module.app, db.DB_PATH
+
+# ===== MEASUREMENT =====
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+class Recorder:
+    """Latencies and outcomes per endpoint for one worker thread"""
+
+    def __init__(self, client):
+        self.client = client
+        self.active = False  # only the measured loop is recorded
+        self.latencies = {}
+        self.counts = {}
+
+    def call(self, name, method, path, json_body=None, form=None, expect=(200,)):
+        start = time.perf_counter()
+        status, body = self.client.request(method, path, json_body, form)
+        elapsed = time.perf_counter() - start
+        if self.active:
+            self.latencies.setdefault(name, []).append(elapsed)
+            counts = self.counts.setdefault(name, {'errors': 0, 'busy': 0, 'conflicts': 0})
+            if status == 409:
+                counts['conflicts'] += 1
+            elif status not in expect:
+                counts['errors'] += 1
+                if any(marker in body.lower() for marker in BUSY_MARKERS):
+                    counts['busy'] += 1
+        try:
+            return status, json.loads(body) if body else None
+        except ValueError:
+            return status, None
+
+def summarize(recorders, elapsed):
+    endpoints = {}
+    names = sorted({name for r in recorders for name in r.latencies})
+    for name in names:
+        values = sorted(v for r in recorders for v in r.latencies.get(name, ()))
+        totals = {'errors': 0, 'busy': 0, 'conflicts': 0}
+        for r in recorders:
+            for key, value in r.counts.get(name, {}).items():
+                totals[key] += value
+        endpoints[name] = {
+            'requests': len(values),
+            'rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 3),
+            'p95_ms': round(percentile(values, 95) * 1000, 3),
+            'p99_ms': round(percentile(values, 99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+            **totals,
+        }
+    total_requests = sum(e['requests'] for e in endpoints.values())
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'requests': total_requests,
+        'rps': round(total_requests / elapsed, 2) if elapsed else 0.0,
+        'errors': sum(e['errors'] for e in endpoints.values()),
+        'busy': sum(e['busy'] for e in endpoints.values()),
+        'conflicts': sum(e['conflicts'] for e in endpoints.values()),
+        'endpoints': endpoints,
+    }
+
+# ===== SCENARIOS =====
+# Each scenario is a class with setup(rec), step(rec) and teardown(rec);
+# one instance per worker. Only step() calls are measured.
+
+class ChatScenario:
+    """Send a message, then poll the room for anything newer"""
+
+    def __init__(self, worker, options, shared):
+        self.room = f"bench-{shared['run_id']}-{worker % options.rooms}"
+        self.sender = f'bench-user-{worker}'
+        self.rng = random.Random(options.seed + worker)
+        self.last_id = 0
+
+    def setup(self, rec):
+        status, body = rec.call('chat.messages', 'GET', f'/api/chat/messages/{self.room}')
+        if status == 200 and body:
+            self.last_id = body.get('last_id') or 0
+
+    def step(self, rec):
+        text = f'benchmark message {self.rng.randrange(10 ** 6)}'
+        rec.call('chat.send', 'POST', '/api/chat/send',
+                 json_body={'room': self.room, 'sender': self.sender, 'message': text})
+        status, body = rec.call('chat.poll', 'GET', f'/api/chat/messages/{self.room}?since={self.last_id}')
+        if status == 200 and body:
+            self.last_id = body.get('last_id') or self.last_id
+
+    def teardown(self, rec):
+        pass
+
+class WebRTCScenario:
+    """Pairs of peers exchanging signals through join/signal/poll"""
+
+    def __init__(self, worker, options, shared):
+        self.room = f"bench-call-{shared['run_id']}-{worker // 2}"
+        self.user_id = f'bench-peer-{worker}'
+        # Partner in the same room; the odd one out signals itself
+        self.peer_id = f'bench-peer-{worker ^ 1}' if (worker ^ 1) < options.concurrency else self.user_id
+        self.after = 0
+
+    def setup(self, rec):
+        rec.call('webrtc.join', 'POST', f'/api/webrtc/join/{self.room}',
+                 json_body={'username': self.user_id, 'user_id': self.user_id})
+
+    def step(self, rec):
+        rec.call('webrtc.signal', 'POST', f'/api/webrtc/signal/{self.room}',
+                 json_body={'from': self.user_id, 'to': self.peer_id, 'type': 'ice-candidate',
+                            'data': {'candidate': 'candidate:0 1 UDP 2122252543 192.0.2.1 50000 typ host'}})
+        status, body = rec.call('webrtc.poll', 'GET',
+                                f'/api/webrtc/signals/{self.room}?user={self.user_id}&after={self.after}')
+        if status == 200 and body:
+            self.after = body.get('last_seq') or self.after
+
+    def teardown(self, rec):
+        rec.call('webrtc.leave', 'POST', f'/api/webrtc/leave/{self.room}',
+                 json_body={'user_id': self.user_id})
+
+class BookingScenario:
+    """Book meetings on distinct advocate/day/time slots"""
+
+    def __init__(self, worker, options, shared):
+        self.shared = shared
+
+    def setup(self, rec):
+        pass
+
+    def step(self, rec):
+        rec.call('booking.book', 'POST', '/api/book-meeting', json_body=booking_payload(self.shared))
+
+    def teardown(self, rec):
+        pass
+
+class AdminScenario:
+    """Dashboard reads: first pages of meetings and clients, then stats"""
+
+    def __init__(self, worker, options, shared):
+        pass
+
+    def setup(self, rec):
+        rec.call('admin.login', 'POST', '/admin/login',
+                 form={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD}, expect=(200, 302))
+
+    def step(self, rec):
+        rec.call('admin.meetings', 'GET', '/api/admin/meetings?limit=50')
+        rec.call('admin.clients', 'GET', '/api/admin/clients?limit=50')
+        rec.call('admin.stats', 'GET', '/api/admin/stats')
+
+    def teardown(self, rec):
+        pass
+
+SCENARIO_CLASSES = {
+    'chat': ChatScenario,
+    'webrtc': WebRTCScenario,
+    'booking': BookingScenario,
+    'admin': AdminScenario,
+}
+
+def booking_payload(shared):
+    """Next unused advocate/day/time combination for this run"""
+    n = next(shared['bookings'])
+    advocates = shared['advocates']
+    advocate_id = advocates[n % len(advocates)]
+    n //= len(advocates)
+    meeting_day = date.today() + timedelta(days=shared['day_offset'] + n // len(BOOKING_TIMES))
+    return {
+        'clientName': f'Bench Client {n}',
+        'clientEmail': f'bench{n}@example.com',
+        'clientPhone': f'9{n % 10 ** 9:09d}',
+        'meetingDate': meeting_day.isoformat(),
+        'meetingTime': BOOKING_TIMES[n % len(BOOKING_TIMES)],
+        'meetingDuration': BOOKING_DURATION,
+        'meetingType': 'video',
+        'advocateId': advocate_id,
+        'caseType': 'Civil Law',
+        'caseDescription': 'Load test booking',
+    }
+
+def seed_meetings(make_client, shared, meetings):
+    """Give the admin scenario something to page through"""
+    client = make_client()
+    for _ in range(meetings):
+        client.request('POST', '/api/book-meeting', booking_payload(shared))
+
+def load_advocate_ids(make_client):
+    status, body = make_client().request('GET', '/api/advocates')
+    try:
+        ids = [a['id'] for a in json.loads(body)['advocates']] if status == 200 else []
+    except (ValueError, KeyError, TypeError):
+        ids = []
+    return ids or ['adv1']
+
+# ===== RUNNER =====
+
+def run_scenario(name, make_client, options, shared):
+    """Run one scenario on ``options.concurrency`` threads; return its summary"""
+    scenario_class = SCENARIO_CLASSES[name]
+    recorders = [Recorder(make_client()) for _ in range(options.concurrency)]
+    scenarios = [scenario_class(i, options, shared) for i in range(options.concurrency)]
+    clock = {}
+
+    def start_clock():
+        clock['start'] = time.perf_counter()
+        clock['deadline'] = clock['start'] + options.duration
+
+    # The clock starts once every worker has finished setup and warmup
+    ready = threading.Barrier(options.concurrency, action=start_clock)
+
+    errors = []
+
+    def worker(i):
+        rec, scenario = recorders[i], scenarios[i]
+        try:
+            scenario.setup(rec)
+            for _ in range(options.warmup):
+                scenario.step(rec)
+            ready.wait()
+            rec.active = True
+            iterations = 0
+            while (iterations < options.iterations if options.iterations
+                   else time.perf_counter() < clock['deadline']):
+                scenario.step(rec)
+                iterations += 1
+            rec.finished = time.perf_counter()
+            rec.active = False
+            scenario.teardown(rec)
+        except BaseException as e:
+            errors.append(e)
+            ready.abort()  # release workers still waiting for this one
+        finally:
+            rec.active = False
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(options.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        # The first error is the worker that failed; the rest saw the aborted barrier
+        raise errors[0]
+    elapsed = max(rec.finished for rec in recorders) - clock['start']
+    return summarize(recorders, elapsed)
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against ``baseline``, as readable strings
+
+    An endpoint regresses when its p95 latency grows, or its throughput
+    drops, by more than ``tolerance`` (a fraction), or when it starts
+    hitting SQLite busy errors.
+    """
+    problems = []
+    for scenario, base in baseline.get('scenarios', {}).items():
+        current = results['scenarios'].get(scenario)
+        if current is None:
+            continue
+        for endpoint, before in base['endpoints'].items():
+            after = current['endpoints'].get(endpoint)
+            if after is None:
+                continue
+            label = f'{scenario}/{endpoint}'
+            if before['p95_ms'] and after['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                problems.append(f"{label}: p95 {before['p95_ms']:.2f}ms -> {after['p95_ms']:.2f}ms")
+            if before['rps'] and after['rps'] < before['rps'] * (1 - tolerance):
+                problems.append(f"{label}: {before['rps']:.1f} -> {after['rps']:.1f} req/s")
+            if after['busy'] > before['busy']:
+                problems.append(f"{label}: SQLite busy errors {before['busy']} -> {after['busy']}")
+    return problems
+
+def print_summary(name, summary):
+    print(f"\n📊 {name}: {summary['requests']} requests in {summary['elapsed_s']:.2f}s "
+          f"({summary['rps']:.1f} req/s), {summary['errors']} errors, "
+          f"{summary['busy']} busy, {summary['conflicts']} conflicts")
+    print(f"   {'endpoint':<16}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'busy':>6}")
+    for endpoint, e in summary['endpoints'].items():
+        print(f"   {endpoint:<16}{e['requests']:>8}{e['rps']:>10.1f}{e['p50_ms']:>10.2f}"
+              f"{e['p95_ms']:>10.2f}{e['p99_ms']:>10.2f}{e['errors']:>8}{e['busy']:>6}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process app')
+    parser.add_argument('--db', help='database file for in-process runs (default: a fresh temp file)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help='worker threads per scenario')
+    parser.add_argument('-d', '--duration', type=float, default=5.0, help='seconds per scenario')
+    parser.add_argument('-n', '--iterations', type=int,
+                        help='fixed iterations per worker instead of --duration (reproducible request counts)')
+    parser.add_argument('--warmup', type=int, default=5, help='unrecorded iterations per worker')
+    parser.add_argument('--rooms', type=int, default=2, help='chat rooms shared by the chat workers')
+    parser.add_argument('--seed-meetings', type=int, default=200, help='meetings booked before the admin scenario')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for message contents')
+    parser.add_argument('-o', '--output', help='write JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed p95/throughput change versus the baseline (fraction)')
+    options = parser.parse_args(argv)
+    options.scenarios = [s.strip() for s in options.scenarios.split(',') if s.strip()]
+    unknown = set(options.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    if options.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    return options
+
+def main(argv=None):
+    options = parse_args(argv)
+    
+    if options.url:
+        target = options.url
+        make_client = lambda: HttpClient(options.url)
+        # A long-lived server keeps earlier runs' bookings; start far from them
+        day_offset = 30 + int(time.time() // 60) % 3000
+    else:
+        app, db_path = local_app(options.db)
+        target = f'in-process ({db_path})'
+        make_client = lambda: LocalClient(app)
+        day_offset = 1
+    
+    shared = {
+        'run_id': uuid.uuid4().hex[:8],
+        'bookings': count(),
+        'day_offset': day_offset,
+        'advocates': load_advocate_ids(make_client),
+    }
+    print(f"🏁 Benchmarking {target}: {', '.join(options.scenarios)} "
+          f"with {options.concurrency} workers")
+    
+    results = {
+        'meta': {
+            'started_at': datetime.now().isoformat(),
+            'target': 'url' if options.url else 'in-process',
+            'concurrency': options.concurrency,
+            'duration': options.duration,
+            'iterations': options.iterations,
+            'warmup': options.warmup,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'scenarios': {},
+    }
+    for name in options.scenarios:
+        if name == 'admin' and options.seed_meetings:
+            seed_meetings(make_client, shared, options.seed_meetings)
+        results['scenarios'][name] = summary = run_scenario(name, make_client, options, shared)
+        print_summary(name, summary)
+    
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {options.output}")
+    
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        for key in ('target', 'concurrency', 'duration', 'iterations'):
+            if baseline.get('meta', {}).get(key) != results['meta'][key]:
+                print(f"⚠️ Baseline was recorded with a different {key}; numbers may not be comparable")
+        problems = compare(results, baseline, options.tolerance)
+        for problem in problems:
+            print(f"❌ {problem}")
+        print(f"✅ No regressions against {options.baseline}" if not problems
+              else f"❌ {len(problems)} regression(s) against {options.baseline}")
+        return 1 if problems else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import threading
+from collections import OrderedDict, deque
+
+# Default cache budgets
+ROOM_CAPACITY = 100  # messages kept per room
+MAX_ROOMS = 500
+MAX_BYTES = 16 * 1024 * 1024
+LOCK_STRIPES = 16
+
+# Rough per-message overhead of the dict, its keys and the deque slot
+MESSAGE_OVERHEAD = 400
+
+def _message_size(message):
+    return MESSAGE_OVERHEAD + len(message.get('message', '')) + len(message.get('sender', ''))
+
+class _RoomEntry:
+    __slots__ = ('messages', 'floor_id', 'size', 'evicted')
+
+    def __init__(self, capacity):
+        self.messages = deque(maxlen=capacity)
+        # Every message of the room with an id above floor_id is cached
+        self.floor_id = 0
+        self.size = 0
+        self.evicted = False
+
+class ChatRoomCache:
+    """Thread-safe, memory-bounded cache of the newest messages per chat room.
+
+    Each room keeps a ring buffer of its last ``room_capacity`` messages.
+    Room state is guarded by one of ``stripes`` locks chosen by room name,
+    so rooms on different stripes never contend. Whole rooms are evicted in
+    least-recently-used order once ``max_rooms`` or ``max_bytes`` is
+    exceeded. Reads go through a loader (normally ``db.get_chat_messages``)
+    on a miss; appends to a room that is not cached are skipped, since the
+    next read loads it from the database anyway.
+    """
+
+    def __init__(self, room_capacity=ROOM_CAPACITY, max_rooms=MAX_ROOMS,
+                 max_bytes=MAX_BYTES, stripes=LOCK_STRIPES):
+        self.room_capacity = room_capacity
+        self.max_rooms = max_rooms
+        self.max_bytes = max_bytes
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._lru_lock = threading.Lock()
+        self._rooms = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _stripe(self, room):
+        return self._stripes[hash(room) % len(self._stripes)]
+
+    def _lookup(self, room):
+        with self._lru_lock:
+            entry = self._rooms.get(room)
+            if entry is not None:
+                self._rooms.move_to_end(room)
+                self._hits += 1
+            else:
+                self._misses += 1
+            return entry
+
+    def _resize(self, entry, delta):
+        with self._lru_lock:
+            entry.size += delta
+            if not entry.evicted:
+                self._bytes += delta
+                self._evict()
+
+    def _evict(self):
+        # Caller holds _lru_lock; never evict the most recently used room
+        while len(self._rooms) > 1 and (
+                len(self._rooms) > self.max_rooms or self._bytes > self.max_bytes):
+            _, entry = self._rooms.popitem(last=False)
+            entry.evicted = True
+            self._bytes -= entry.size
+            self._evictions += 1
+
+    def _load(self, room, loader):
+        # Caller holds the room's stripe lock
+        messages = loader(room, self.room_capacity)
+        entry = _RoomEntry(self.room_capacity)
+        entry.messages.extend(messages)
+        if len(messages) >= self.room_capacity:
+            entry.floor_id = messages[0]['id'] - 1
+        entry.size = sum(_message_size(m) for m in messages)
+        if not messages:
+            # Don't pin empty rooms (or failed loads) in the cache
+            return entry
+
+        with self._lru_lock:
+            old = self._rooms.pop(room, None)
+            if old is not None:
+                old.evicted = True
+                self._bytes -= old.size
+            self._rooms[room] = entry
+            self._bytes += entry.size
+            self._evict()
+        return entry
+
+    def _entry(self, room, loader):
+        entry = self._lookup(room)
+        if entry is None or entry.evicted:
+            entry = self._load(room, loader)
+        return entry
+
+    def get_recent(self, room, limit, loader):
+        """The newest ``limit`` messages of a room, oldest first"""
+        with self._stripe(room):
+            entry = self._entry(room, loader)
+            messages = list(entry.messages)
+        return messages[-limit:] if limit else messages
+
+    def get_since(self, room, since, limit):
+        """Messages newer than ``since`` if the cache covers them, else None"""
+        with self._stripe(room):
+            entry = self._lookup(room)
+            if entry is None or entry.evicted or since < entry.floor_id:
+                return None
+            messages = [m for m in entry.messages if m['id'] > since]
+        return messages[:limit]
+
+    def append(self, room, message):
+        """Add a newly saved message to its room's ring buffer, if cached"""
+        with self._stripe(room):
+            with self._lru_lock:
+                entry = self._rooms.get(room)
+            if entry is None or entry.evicted:
+                return
+            if entry.messages and entry.messages[-1]['id'] >= message['id']:
+                return
+
+            delta = _message_size(message)
+            if len(entry.messages) == entry.messages.maxlen:
+                dropped = entry.messages[0]
+                delta -= _message_size(dropped)
+                entry.floor_id = dropped['id']
+            entry.messages.append(message)
+            self._resize(entry, delta)
+
+    def discard(self, room):
+        with self._stripe(room):
+            with self._lru_lock:
+                entry = self._rooms.pop(room, None)
+                if entry is not None:
+                    entry.evicted = True
+                    self._bytes -= entry.size
+
+    def clear(self):
+        with self._lru_lock:
+            for entry in self._rooms.values():
+                entry.evicted = True
+            self._rooms.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lru_lock:
+            return len(self._rooms)
+
+    def __contains__(self, room):
+        with self._lru_lock:
+            return room in self._rooms
+
+    def stats(self):
+        with self._lru_lock:
+            lookups = self._hits + self._misses
+            return {
+                'rooms': len(self._rooms),
+                'bytes': self._bytes,
+                'max_rooms': self.max_rooms,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_ratio': round(self._hits / lookups, 3) if lookups else 0.0
+            }
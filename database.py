@@ -1,334 +1,1577 @@
 import sqlite3
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+import atexit
+import base64
+import itertools
+import json
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from applog import get_logger
+
+log = get_logger('database')
 
 # Database configuration
 DB_PATH = os.path.join(os.path.dirname(__file__), 'chat.db')
 
+# Connection pool configuration
+POOL_MAX_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+POOL_ACQUIRE_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+
+# Chat write-behind (group commit) configuration
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get('CHAT_WRITE_BATCH_SIZE', '200'))
+WRITE_BEHIND_MAX_DELAY = float(os.environ.get('CHAT_WRITE_MAX_DELAY_MS', '5')) / 1000
+WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get('CHAT_WRITE_QUEUE_SIZE', '5000'))
+WRITE_BEHIND_ENQUEUE_TIMEOUT = float(os.environ.get('CHAT_WRITE_ENQUEUE_TIMEOUT', '2'))
+WRITE_BEHIND_RESULT_TIMEOUT = 30.0
+
+# Chat retention: messages older than CHAT_RETENTION_DAYS are moved to the
+# archive database (default: chat_archive.db beside chat.db); 0 keeps
+# everything in the main database
+CHAT_RETENTION_DAYS = int(os.environ.get('CHAT_RETENTION_DAYS', '0'))
+CHAT_ARCHIVE_PATH = os.environ.get('CHAT_ARCHIVE_PATH')
+CHAT_ARCHIVE_BATCH_SIZE = int(os.environ.get('CHAT_ARCHIVE_BATCH_SIZE', '500'))
+CHAT_ARCHIVE_INTERVAL = float(os.environ.get('CHAT_ARCHIVE_INTERVAL_HOURS', '6')) * 3600
+
+def _open_connection(check_same_thread=True, path=None):
+    """Open a new SQLite connection and apply the per-connection PRAGMAs"""
+    conn = sqlite3.connect(path or DB_PATH, timeout=30.0, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    # Only takes effect on a new file (before WAL and the first table);
+    # existing databases switch once with `python database.py vacuum`
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    # Enable WAL mode for better concurrent access
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA cache_size=1000')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
 def get_connection():
-    """Get database connection with proper configuration"""
+    """Get a standalone database connection (caller must close it)"""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=30.0)  # Add timeout
-        conn.row_factory = sqlite3.Row
-        # Enable WAL mode for better concurrent access
-        conn.execute('PRAGMA journal_mode=WAL')
-        conn.execute('PRAGMA synchronous=NORMAL')
-        conn.execute('PRAGMA cache_size=1000')
-        conn.execute('PRAGMA temp_store=MEMORY')
-        return conn
+        return _open_connection()
     except sqlite3.Error as e:
-        print(f"❌ Database connection error: {e}")
+        log.error("Database connection error: %s", e)
         raise
 
-def init_database():
-    """Initialize database with all required tables"""
-    print("🗄️ Database path:", DB_PATH)
-    print("🔧 Creating database tables...")
-    
+class ConnectionPool:
+    """Bounded pool of long-lived, pre-configured SQLite connections.
+
+    Connections are opened lazily up to ``max_size`` and handed out through
+    :meth:`connection`. A connection that raised a database error is closed
+    and replaced instead of being returned to the pool.
+    """
+
+    def __init__(self, db_path, max_size=POOL_MAX_SIZE, timeout=POOL_ACQUIRE_TIMEOUT):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._recycled = 0
+
+    def _acquire(self):
+        start = time.monotonic()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_open = self._size < self.max_size
+                if can_open:
+                    self._size += 1
+            if can_open:
+                try:
+                    conn = _open_connection(check_same_thread=False)
+                except sqlite3.Error:
+                    with self._lock:
+                        self._size -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"connection pool exhausted ({self.max_size} connections in use)"
+                    )
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            if waited > 0.001:
+                self._waits += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    def _release(self, conn, discard=False):
+        with self._lock:
+            self._in_use -= 1
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+        if discard:
+            with self._lock:
+                self._size -= 1
+                self._recycled += 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; uncommitted work is rolled back on return"""
+        conn = self._acquire()
+        try:
+            yield conn
+        except sqlite3.IntegrityError:
+            self._release(conn)
+            raise
+        except sqlite3.Error:
+            # The connection may be in an unknown state - replace it
+            self._release(conn, discard=True)
+            raise
+        except BaseException:
+            self._release(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'acquired': self._acquired,
+                'waits': self._waits,
+                'avg_wait_ms': round(self._wait_time / self._acquired * 1000, 3) if self._acquired else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 3),
+                'wait_seconds': round(self._wait_time, 6),
+                'recycled': self._recycled
+            }
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._size -= 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Get the process-wide connection pool, rebuilding it after a fork or DB_PATH change"""
+    global _pool
+    pool = _pool
+    if pool is None or pool.pid != os.getpid() or pool.db_path != DB_PATH:
+        with _pool_lock:
+            pool = _pool
+            if pool is None or pool.pid != os.getpid() or pool.db_path != DB_PATH:
+                if pool is not None and pool.pid == os.getpid():
+                    pool.close()
+                pool = _pool = ConnectionPool(DB_PATH)
+    return pool
+
+def connection():
+    """Context manager yielding a pooled database connection"""
+    return get_pool().connection()
+
+def get_pool_stats():
+    """Get connection pool statistics (size, in-use, wait time)"""
+    return get_pool().stats()
+
+def close_pool():
+    """Close all idle pooled connections"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+def _day(column):
+    """SQL expression for the per-day bucket of a date/time column"""
+    return f"COALESCE(date({column}), 'unknown')"
+
+def _bump_counter(name_expr, day_expr, delta):
+    """SQL statement that adds ``delta`` to a stats counter, creating it if needed"""
+    return f"""
+        INSERT INTO stats_counters (name, day, value) VALUES ({name_expr}, {day_expr}, {delta})
+        ON CONFLICT(name, day) DO UPDATE SET value = value + excluded.value;"""
+
+# Skips the message stats delete trigger while archive_chat_messages()
+# moves rows out, so archived messages stay counted
+ARCHIVE_GUARD = 'WHEN NOT EXISTS (SELECT 1 FROM chat_archiving)'
+
+# Triggers keeping stats_counters in step with the base tables. day '' holds
+# all-time totals; per-day buckets are keyed by the row's own date.
+STATS_TRIGGERS = {
+    'trg_stats_clients_insert': f"""
+        AFTER INSERT ON clients BEGIN
+            {_bump_counter("'clients'", "''", 1)}
+            {_bump_counter("'clients'", _day('NEW.registered_at'), 1)}
+        END""",
+    'trg_stats_clients_delete': f"""
+        AFTER DELETE ON clients BEGIN
+            {_bump_counter("'clients'", "''", -1)}
+            {_bump_counter("'clients'", _day('OLD.registered_at'), -1)}
+        END""",
+    'trg_stats_meetings_insert': f"""
+        AFTER INSERT ON meeting_bookings BEGIN
+            {_bump_counter("'meetings'", "''", 1)}
+            {_bump_counter("'meetings:' || COALESCE(NEW.status, '')", "''", 1)}
+            {_bump_counter("'meetings'", _day('NEW.meeting_date'), 1)}
+        END""",
+    'trg_stats_meetings_delete': f"""
+        AFTER DELETE ON meeting_bookings BEGIN
+            {_bump_counter("'meetings'", "''", -1)}
+            {_bump_counter("'meetings:' || COALESCE(OLD.status, '')", "''", -1)}
+            {_bump_counter("'meetings'", _day('OLD.meeting_date'), -1)}
+        END""",
+    'trg_stats_meetings_status': f"""
+        AFTER UPDATE OF status ON meeting_bookings
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            {_bump_counter("'meetings:' || COALESCE(OLD.status, '')", "''", -1)}
+            {_bump_counter("'meetings:' || COALESCE(NEW.status, '')", "''", 1)}
+        END""",
+    'trg_stats_meetings_date': f"""
+        AFTER UPDATE OF meeting_date ON meeting_bookings
+        WHEN {_day('OLD.meeting_date')} IS NOT {_day('NEW.meeting_date')} BEGIN
+            {_bump_counter("'meetings'", _day('OLD.meeting_date'), -1)}
+            {_bump_counter("'meetings'", _day('NEW.meeting_date'), 1)}
+        END""",
+    'trg_stats_messages_insert': f"""
+        AFTER INSERT ON chat_messages BEGIN
+            {_bump_counter("'messages'", "''", 1)}
+            {_bump_counter("'messages'", _day('NEW.timestamp'), 1)}
+        END""",
+    'trg_stats_messages_delete': f"""
+        AFTER DELETE ON chat_messages {ARCHIVE_GUARD} BEGIN
+            {_bump_counter("'messages'", "''", -1)}
+            {_bump_counter("'messages'", _day('OLD.timestamp'), -1)}
+        END""",
+}
+
+# Queries recomputing every counter from scratch, as (name, day, value) rows
+STATS_REBUILD_QUERIES = (
+    "SELECT 'clients', '', COUNT(*) FROM clients",
+    f"SELECT 'clients', {_day('registered_at')}, COUNT(*) FROM clients GROUP BY 2",
+    "SELECT 'meetings', '', COUNT(*) FROM meeting_bookings",
+    "SELECT 'meetings:' || COALESCE(status, ''), '', COUNT(*) FROM meeting_bookings GROUP BY 1",
+    f"SELECT 'meetings', {_day('meeting_date')}, COUNT(*) FROM meeting_bookings GROUP BY 2",
+    "SELECT 'messages', '', COUNT(*) FROM chat_messages",
+    f"SELECT 'messages', {_day('timestamp')}, COUNT(*) FROM chat_messages GROUP BY 2",
+)
+
+def _create_stats_counters(cursor):
+    """Create the stats_counters table and the triggers that maintain it"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name TEXT NOT NULL,
+            day TEXT NOT NULL DEFAULT '',
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, day)
+        ) WITHOUT ROWID
+    ''')
+    for trigger_name, body in STATS_TRIGGERS.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {trigger_name} {body}')
+
+# Archived messages still count towards the message totals (WHERE true lets
+# the upsert below parse after a SELECT)
+ARCHIVE_STATS_REBUILD_QUERIES = (
+    "SELECT 'messages', '', COUNT(*) FROM archive.chat_messages WHERE true",
+    f"SELECT 'messages', {_day('timestamp')}, COUNT(*) FROM archive.chat_messages WHERE true GROUP BY 2",
+)
+
+def _rebuild_stats_counters(cursor, archive=False):
+    cursor.execute('DELETE FROM stats_counters')
+    for query in STATS_REBUILD_QUERIES:
+        cursor.execute(f'INSERT INTO stats_counters (name, day, value) {query}')
+    if archive:
+        for query in ARCHIVE_STATS_REBUILD_QUERIES:
+            cursor.execute(f'''
+                INSERT INTO stats_counters (name, day, value) {query}
+                ON CONFLICT(name, day) DO UPDATE SET value = value + excluded.value
+            ''')
+
+def rebuild_stats_counters():
+    """Recompute every stats counter from the base tables in one transaction"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        print("🔄 Rebuilding stats counters...")
         
-        # Drop existing table if structure needs to change
-        cursor.execute('DROP TABLE IF EXISTS meeting_bookings')
+        archive = _archive_in_use()
+        with (_archive_connection() if archive else connection()) as conn:
+            _rebuild_stats_counters(conn.cursor(), archive)
+            conn.commit()
         
-        # Clients table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS clients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                phone TEXT,
-                city TEXT,
-                email TEXT,
-                registered_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        print("✅ Stats counters rebuilt")
+        return True
         
-        # Fixed Meeting bookings table (removed advocate_id)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS meeting_bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_name TEXT NOT NULL,
-                client_email TEXT NOT NULL,
-                client_phone TEXT NOT NULL,
-                client_city TEXT,
-                advocate_name TEXT NOT NULL,
-                meeting_date TEXT NOT NULL,
-                meeting_time TEXT NOT NULL,
-                meeting_type TEXT NOT NULL,
-                meeting_duration TEXT DEFAULT '45',
-                case_type TEXT,
-                case_description TEXT,
-                urgency_level TEXT DEFAULT 'medium',
-                previous_legal_action TEXT DEFAULT 'no',
-                special_requirements TEXT,
-                status TEXT DEFAULT 'pending',
-                created_at TEXT NOT NULL,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
+    except sqlite3.Error as e:
+        print(f"❌ Rebuild stats counters error: {e}")
+        return False
+
+# Tables whose every write bumps a row in change_versions (used for ETags)
+VERSIONED_TABLES = ('clients', 'meeting_bookings', 'chat_messages')
+
+def _bump_version(table):
+    return f"""
+        INSERT INTO change_versions (name, version) VALUES ('{table}', 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1;"""
+
+def _create_change_versions(cursor):
+    """Create the change_versions table and its per-table write triggers"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for table in VERSIONED_TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_version_{table}_{event.lower()}
+                AFTER {event} ON {table} BEGIN {_bump_version(table)} END
+            ''')
+
+CHANGE_VERSIONS_SQL = (
+    'SELECT name, version FROM change_versions '
+    f"WHERE name IN ({', '.join('?' for _ in VERSIONED_TABLES)})"
+)
+ROOM_VERSION_SQL = 'SELECT MAX(id) FROM chat_messages WHERE room = ?'
+
+def get_change_versions():
+    """Get the write version of every versioned table, keyed by table name"""
+    with connection() as conn:
+        rows = conn.execute(CHANGE_VERSIONS_SQL, VERSIONED_TABLES).fetchall()
+    return {name: version for name, version in rows}
+
+def get_room_version(room):
+    """Newest message id in a chat room (0 when empty) - an index-only lookup"""
+    with connection() as conn:
+        row = conn.execute(ROOM_VERSION_SQL, (room,)).fetchone()
+    return row[0] or 0
+
+# Full-text indexes: FTS5 table -> (source table, indexed text column).
+# Each FTS row shares its rowid with the source row it indexes.
+SEARCH_INDEXES = {
+    'chat_messages_fts': ('chat_messages', 'message'),
+    'meetings_fts': ('meeting_bookings', 'case_description'),
+}
+
+SEARCH_TOKENIZER = 'unicode61 remove_diacritics 2'
+
+def _create_search_indexes(cursor):
+    """Create the FTS5 tables, their sync triggers and the backfill queue
+
+    Rows written from now on are indexed by the triggers; rows that already
+    exist are left for backfill_search_indexes() to index in chunks.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_backfill (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            target_id INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for fts, (table, column) in SEARCH_INDEXES.items():
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+            USING fts5({column}, tokenize='{SEARCH_TOKENIZER}')
         ''')
-        
-        # Chat messages table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS chat_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                room TEXT NOT NULL,
-                sender TEXT NOT NULL,
-                message TEXT NOT NULL,
-                timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-            )
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, {column}) VALUES (new.id, COALESCE(new.{column}, ''));
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} BEGIN
+                DELETE FROM {fts} WHERE rowid = old.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {column} ON {table} BEGIN
+                DELETE FROM {fts} WHERE rowid = old.id;
+                INSERT INTO {fts} (rowid, {column}) VALUES (new.id, COALESCE(new.{column}, ''));
+            END
         ''')
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO search_backfill (name, last_id, target_id)
+            SELECT '{fts}', 0, COALESCE(MAX(id), 0) FROM {table}
+        ''')
+
+# ===== SCHEMA MIGRATIONS =====
+# Each step runs once, in order, inside the migration transaction.
+# PRAGMA user_version records the last step applied.
+
+def _migration_base_tables(cursor):
+    # Clients table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            city TEXT,
+            email TEXT,
+            registered_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Meeting bookings table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS meeting_bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_name TEXT NOT NULL,
+            client_email TEXT NOT NULL,
+            client_phone TEXT NOT NULL,
+            client_city TEXT,
+            advocate_name TEXT NOT NULL,
+            meeting_date TEXT NOT NULL,
+            meeting_time TEXT NOT NULL,
+            meeting_type TEXT NOT NULL,
+            meeting_duration TEXT DEFAULT '45',
+            case_type TEXT,
+            case_description TEXT,
+            urgency_level TEXT DEFAULT 'medium',
+            previous_legal_action TEXT DEFAULT 'no',
+            special_requirements TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Chat messages table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room TEXT NOT NULL,
+            sender TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_date ON meeting_bookings(meeting_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_status ON meeting_bookings(status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_room ON chat_messages(room)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat_messages(timestamp)')
+
+def _migration_stats_counters(cursor):
+    _create_stats_counters(cursor)
+    _rebuild_stats_counters(cursor)
+
+def _migration_admin_list_indexes(cursor):
+    # Composite indexes backing admin list filters and keyset sorts
+    # (SQLite appends the rowid, so each also orders by id)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_created ON meeting_bookings(created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_status_created ON meeting_bookings(status, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_advocate_date ON meeting_bookings(advocate_name, meeting_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_urgency_created ON meeting_bookings(urgency_level, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_case_type_created ON meeting_bookings(case_type, created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_clients_registered ON clients(registered_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_clients_city_registered ON clients(city, registered_at)')
+
+def _migration_hot_query_indexes(cursor):
+    # get_chat_messages walks (room, id); it replaces the room-only index
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_room_id ON chat_messages(room, id)')
+    cursor.execute('DROP INDEX IF EXISTS idx_chat_room')
+    # Today's counter buckets are read by day
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_stats_counters_day ON stats_counters(day)')
+
+def _migration_advocate_load_index(cursor):
+    # Covers get_advocate_load(); meeting_date alone is now a redundant prefix
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_date_advocate '
+                   'ON meeting_bookings(meeting_date, advocate_name, status)')
+    cursor.execute('DROP INDEX IF EXISTS idx_meetings_date')
+
+def _migration_meeting_slot_index(cursor):
+    # Covers get_advocate_bookings() for slot and conflict checks
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_advocate_slot ON meeting_bookings('
+                   'advocate_name, meeting_date, meeting_time, meeting_duration, status)')
+
+def _migration_shared_state(cursor):
+    # WebRTC signals and presence shared by every worker process
+    # (STATE_BACKEND=sqlite); seq doubles as the poll cursor
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rtc_signals (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            room TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            sender TEXT,
+            payload TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rtc_signals_room_seq ON rtc_signals(room, seq)')
+    # empty_until (wall-clock seconds) is set while nobody is in the room
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rtc_rooms (
+            room TEXT PRIMARY KEY,
+            empty_until REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rtc_rooms_empty ON rtc_rooms(empty_until)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rtc_presence (
+            room TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            username TEXT NOT NULL,
+            joined_at TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (room, user_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rtc_presence_name ON rtc_presence(room, username)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rtc_presence_expires ON rtc_presence(expires_at)')
+
+def _merge_duplicate_clients(cursor):
+    """Fold clients sharing an identity key into one row; returns the ids removed
+
+    The row already holding the key (else the oldest) survives, with the
+    newest name and the newest non-blank phone/city/email - what
+    registering again would have left. Nothing references clients by id,
+    so the extra rows are deleted.
+    """
+    groups = {}
+    for row in cursor.execute('SELECT id, name, phone, city, email, identity_key FROM clients ORDER BY id').fetchall():
+        key = client_identity_key(row[2], row[4])
+        if key is not None:
+            groups.setdefault(key, []).append(tuple(row))
+
+    removed = []
+    for key, rows in groups.items():
+        if len(rows) < 2:
+            continue
+        keeper = next((row for row in rows if row[5] == key), rows[0])
+        name, phone, city, email = keeper[1:5]
+        for row in rows:
+            name = row[1] or name
+            phone, city, email = [new or old for new, old in zip(row[2:5], (phone, city, email))]
+        cursor.execute('UPDATE clients SET name = ?, phone = ?, city = ?, email = ? WHERE id = ?',
+                       (name, phone, city, email, keeper[0]))
+        extra = [row[0] for row in rows if row[0] != keeper[0]]
+        cursor.executemany('DELETE FROM clients WHERE id = ?', [(client_id,) for client_id in extra])
+        removed += extra
+
+    if removed:
+        print(f"🔗 Merged {len(removed)} duplicate clients: removed ids {', '.join(map(str, removed))}")
+    return removed
+
+def _migration_client_identity(cursor):
+    # Normalized phone/email key; its unique index turns registration into
+    # an upsert. Existing duplicates are merged first, so every client gets its key
+    if 'identity_key' not in [row[1] for row in cursor.execute('PRAGMA table_info(clients)')]:
+        cursor.execute('ALTER TABLE clients ADD COLUMN identity_key TEXT')
+    _merge_duplicate_clients(cursor)
+    claimed = {key: None for (key,) in cursor.execute(
+        'SELECT identity_key FROM clients WHERE identity_key IS NOT NULL').fetchall()}
+    for client_id, phone, email in cursor.execute(
+            'SELECT id, phone, email FROM clients WHERE identity_key IS NULL ORDER BY id').fetchall():
+        key = client_identity_key(phone, email)
+        if key is not None:
+            claimed.setdefault(key, client_id)
+    cursor.executemany('UPDATE clients SET identity_key = ? WHERE id = ?',
+                       [(key, client_id) for key, client_id in claimed.items() if client_id is not None])
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_clients_identity '
+                   'ON clients(identity_key) WHERE identity_key IS NOT NULL')
+
+def _migration_chat_archive(cursor):
+    # chat_archiving holds a row only inside an archive transaction (see
+    # ARCHIVE_GUARD); chat_archive_rooms lists rooms with archived history
+    cursor.execute('CREATE TABLE IF NOT EXISTS chat_archiving (active INTEGER)')
+    cursor.execute('CREATE TABLE IF NOT EXISTS chat_archive_rooms (room TEXT PRIMARY KEY) WITHOUT ROWID')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_stats_messages_delete')
+    cursor.execute('DROP TRIGGER IF EXISTS trg_chat_messages_fts_delete')
+    _create_stats_counters(cursor)
+    _create_search_indexes(cursor)
+
+def _migration_archive_search_index(cursor):
+    # Archived messages move to the archive's own search index (see
+    # _attach_archive), so the live index drops them like any delete
+    cursor.execute('DROP TRIGGER IF EXISTS trg_chat_messages_fts_delete')
+    _create_search_indexes(cursor)
+    cursor.execute('DELETE FROM chat_messages_fts WHERE rowid NOT IN (SELECT id FROM chat_messages)')
+
+MIGRATIONS = (
+    (1, 'base tables', _migration_base_tables),
+    (2, 'stats counters', _migration_stats_counters),
+    (3, 'change versions', _create_change_versions),
+    (4, 'admin list indexes', _migration_admin_list_indexes),
+    (5, 'hot query indexes', _migration_hot_query_indexes),
+    (6, 'advocate load index', _migration_advocate_load_index),
+    (7, 'meeting slot index', _migration_meeting_slot_index),
+    (8, 'full-text search indexes', _create_search_indexes),
+    (9, 'shared realtime state', _migration_shared_state),
+    (10, 'client identity key', _migration_client_identity),
+    (11, 'chat archive guard', _migration_chat_archive),
+    # Databases migrated to 10 before duplicates were merged
+    (12, 'merge duplicate clients', _migration_client_identity),
+    (13, 'archive search index', _migration_archive_search_index),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate():
+    """Apply pending migrations in a single transaction
+
+    Returns the list of versions applied; empty (and no DDL run) when the
+    schema is already current.
+    """
+    with connection() as conn:
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return []
+        
+        # Another worker may be migrating too - re-check under the write lock
+        conn.execute('BEGIN IMMEDIATE')
+        current = get_schema_version(conn)
+        pending = [m for m in MIGRATIONS if m[0] > current]
         
-        # Create indexes for better performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_date ON meeting_bookings(meeting_date)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_status ON meeting_bookings(status)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_room ON chat_messages(room)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat_messages(timestamp)')
+        cursor = conn.cursor()
+        for version, description, step in pending:
+            print(f"🔧 Applying migration {version}: {description}")
+            step(cursor)
         
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         conn.commit()
-        conn.close()
+    
+    return [m[0] for m in pending]
+
+def init_database():
+    """Initialize database by applying any pending schema migrations"""
+    print("🗄️ Database path:", DB_PATH)
+    
+    try:
+        applied = migrate()
         
-        print("✅ Database initialized successfully!")
+        if applied:
+            print(f"✅ Database migrated to schema version {SCHEMA_VERSION}")
         print("🎯 Database ready for use!")
         
     except sqlite3.Error as e:
         print(f"❌ Database initialization error: {e}")
         raise
 
+STATS_COUNTERS_SQL = "SELECT name, day, value FROM stats_counters WHERE day IN ('', ?)"
+
+def get_stats_counters(day=None):
+    """Get all-time totals and the per-day buckets for ``day`` (default today)
+
+    Returns ``(totals, daily)`` dicts keyed by counter name.
+    """
+    day = day or datetime.now().date().isoformat()
+    with connection() as conn:
+        rows = conn.execute(STATS_COUNTERS_SQL, (day,)).fetchall()
+    
+    totals, daily = {}, {}
+    for name, row_day, value in rows:
+        (daily if row_day else totals)[name] = value
+    return totals, daily
+
+def client_identity_key(phone=None, email=None):
+    """Normalized identity used to deduplicate clients, or None
+
+    The last 10 digits of the phone ('+91 98765-43210' and '098765 43210'
+    match), else the lower-cased email.
+    """
+    digits = ''.join(ch for ch in phone or '' if ch.isdigit())
+    if len(digits) >= 10:
+        return 'phone:' + digits[-10:]
+    email = (email or '').strip().lower()
+    if '@' in email:
+        return 'email:' + email
+    return None
+
+# New clients: the insert returns a row only when it actually adds one
+# (a taken identity_key makes it a no-op), which is what tells creates
+# from updates. Returning clients are then refreshed by key; blank fields
+# keep their stored value.
+CLIENT_INSERT = '''
+    INSERT INTO clients (name, phone, city, email, registered_at, identity_key)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(identity_key) WHERE identity_key IS NOT NULL DO NOTHING
+    RETURNING id
+'''
+CLIENT_REFRESH = '''
+    UPDATE clients SET
+        name = ?,
+        phone = COALESCE(NULLIF(?, ''), phone),
+        city = COALESCE(NULLIF(?, ''), city),
+        email = COALESCE(NULLIF(?, ''), email)
+    WHERE identity_key = ?
+    RETURNING id
+'''
+
+def _upsert_client(conn, name, phone=None, city=None, email=None):
+    """Insert or refresh one client; returns (client_id, created)"""
+    key = client_identity_key(phone, email)
+    fields = (name, phone or '', city or '', email or '')
+    rows = conn.execute(CLIENT_INSERT, fields + (datetime.now().isoformat(), key)).fetchall()
+    if rows:
+        return rows[0][0], True
+    return conn.execute(CLIENT_REFRESH, fields + (key,)).fetchall()[0][0], False
+
 def register_client(name, phone=None, city=None, email=None):
-    """Register a new client with proper connection handling"""
-    conn = None
+    """Register a client, or refresh the one with the same phone/email"""
     try:
-        print(f"📝 Registering client: {name}")
-        
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Check if client already exists by name and phone
-        if phone:
-            cursor.execute(
-                "SELECT id FROM clients WHERE name = ? AND phone = ?",
-                (name, phone)
-            )
-            existing = cursor.fetchone()
-            
-            if existing:
-                print(f"⚠️ Client already exists: {name} - {phone}")
-                return existing[0]
-        
-        # Insert new client
-        cursor.execute('''
-            INSERT INTO clients (name, phone, city, email, registered_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            name,
-            phone or '',
-            city or '',
-            email or '',
-            datetime.now().isoformat()
-        ))
-        
-        client_id = cursor.lastrowid
-        conn.commit()
+        with connection() as conn:
+            client_id, created = _upsert_client(conn, name, phone, city, email)
+            conn.commit()
         
-        print(f"✅ Client registered successfully: ID {client_id}")
+        if created:
+            log.info("Client registered", extra={'event': 'client.registered', 'client_id': client_id})
+        else:
+            log.info("Client already registered", extra={'event': 'client.exists', 'client_id': client_id})
         return client_id
-        
+    
     except sqlite3.Error as e:
-        print(f"❌ Client registration error: {e}")
-        if conn:
-            conn.rollback()
+        log.error("Client registration error: %s", e, extra={'event': 'client.register_failed'})
         return None
-    finally:
-        if conn:
-            conn.close()
+
+def register_clients(clients):
+    """Register many (name, phone, city, email) clients in one transaction
+
+    Returns a (client_id, created) pair per client, in order. Nothing is
+    committed if any row fails (sqlite3.Error propagates).
+    """
+    with connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        results = [_upsert_client(conn, *client) for client in clients]
+        conn.commit()
+    
+    created = sum(1 for _, is_new in results if is_new)
+    log.info("Clients registered", extra={'event': 'client.batch_registered',
+                                          'new_clients': created, 'existing_clients': len(results) - created})
+    return results
 
 def save_chat_message(room, sender, message):
-    """Save chat message with proper connection handling"""
-    conn = None
+    """Save chat message with proper connection handling
+
+    In write-behind mode the message is queued for the background writer
+    and this waits for its batch to commit; WriteQueueFull is raised when
+    the queue is saturated.
+    """
     try:
-        print(f"💾 Saving message: {sender} in {room}")
-        
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO chat_messages (room, sender, message, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            room,
-            sender,
-            message,
-            datetime.now().isoformat()
-        ))
-        
-        message_id = cursor.lastrowid
-        conn.commit()
+        if _write_behind is not None:
+            future = _write_behind.submit(room, sender, message)
+            message_id = future.result(WRITE_BEHIND_RESULT_TIMEOUT)
+        else:
+            with connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    INSERT INTO chat_messages (room, sender, message, timestamp)
+                    VALUES (?, ?, ?, ?)
+                ''', (
+                    room,
+                    sender,
+                    message,
+                    datetime.now().isoformat()
+                ))
+                
+                message_id = cursor.lastrowid
+                conn.commit()
         
-        print(f"✅ Message saved: ID {message_id}")
+        log.debug("Message saved", extra={'event': 'chat.message_saved', 'room': room, 'message_id': message_id})
         return message_id
         
-    except sqlite3.Error as e:
-        print(f"❌ Save message error: {e}")
-        if conn:
-            conn.rollback()
+    except (sqlite3.Error, FutureTimeout) as e:
+        log.error("Save message error: %s", e, extra={'event': 'chat.save_failed', 'room': room})
         return None
-    finally:
-        if conn:
-            conn.close()
 
-def get_chat_messages(room, limit=50):
-    """Get chat messages with proper connection handling"""
-    conn = None
+class WriteQueueFull(Exception):
+    """Raised when the write-behind queue stays full past the enqueue timeout"""
+
+class ChatWriteBehind:
+    """Background writer that persists chat messages in group commits.
+
+    Producers :meth:`submit` messages into a bounded queue and get a
+    ``Future`` that resolves to the row id once the batch holding the
+    message has committed. The writer thread drains up to ``max_batch``
+    messages, waiting at most ``max_delay`` seconds after the first one,
+    and inserts them with ``executemany`` in a single transaction.
+    ``on_commit`` is called from the writer thread with the committed
+    messages in id order, before their futures resolve.
+    """
+
+    def __init__(self, max_batch=WRITE_BEHIND_MAX_BATCH, max_delay=WRITE_BEHIND_MAX_DELAY,
+                 queue_size=WRITE_BEHIND_QUEUE_SIZE, enqueue_timeout=WRITE_BEHIND_ENQUEUE_TIMEOUT,
+                 on_commit=None):
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.on_commit = on_commit
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch_seen = 0
+        self._rejected = 0
+        self._failed = 0
+
+    def _ensure_started(self):
+        # (Re)start the writer lazily so forked workers get their own thread
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='chat-write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, room, sender, message):
+        """Queue a message for the next batch; blocks briefly when the queue is full"""
+        self._ensure_started()
+        future = Future()
+        item = (room, sender, message, datetime.now().isoformat(), future)
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise WriteQueueFull(f"chat write queue full ({self.queue_size} pending)")
+        return future
+
+    def _run(self):
+        q = self._queue
+        while not (self._stopping.is_set() and q.empty()):
+            try:
+                first = q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def _write_batch(self, batch):
+        rows = [item[:4] for item in batch]
+        try:
+            with connection() as conn:
+                conn.executemany('''
+                    INSERT INTO chat_messages (room, sender, message, timestamp)
+                    VALUES (?, ?, ?, ?)
+                ''', rows)
+                # One writer holds the lock for the whole transaction, so
+                # AUTOINCREMENT hands out a contiguous block of ids
+                last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+                conn.commit()
+        except sqlite3.Error as e:
+            log.error("Write-behind batch error: %s", e, extra={'event': 'chat.batch_failed', 'batch_size': len(batch)})
+            with self._lock:
+                self._failed += len(batch)
+            for item in batch:
+                item[4].set_exception(e)
+            return
+
+        first_id = last_id - len(batch) + 1
+        with self._lock:
+            self._batches += 1
+            self._rows += len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        if self.on_commit is not None:
+            committed = [(first_id + i,) + row for i, row in enumerate(rows)]
+            try:
+                self.on_commit(committed)
+            except Exception as e:
+                log.exception("Write-behind commit hook error", extra={'event': 'chat.commit_hook_failed'})
+
+        for i, item in enumerate(batch):
+            item[4].set_result(first_id + i)
+
+    def flush(self):
+        """Block until every queued message has been committed"""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def stop(self, timeout=10.0):
+        """Flush pending messages and stop the writer thread"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize() if self._queue is not None else 0,
+                'queue_size': self.queue_size,
+                'batches': self._batches,
+                'rows': self._rows,
+                'avg_batch': round(self._rows / self._batches, 2) if self._batches else 0.0,
+                'max_batch': self._max_batch_seen,
+                'rejected': self._rejected,
+                'failed': self._failed
+            }
+
+_write_behind = None
+
+def enable_write_behind(on_commit=None, **options):
+    """Route save_chat_message through a group-commit background writer"""
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = ChatWriteBehind(on_commit=on_commit, **options)
+        atexit.register(_write_behind.stop)
+    return _write_behind
+
+def write_behind_enabled():
+    return _write_behind is not None
+
+def get_write_behind_stats():
+    return _write_behind.stats() if _write_behind is not None else None
+
+def flush_write_behind():
+    """Commit all queued chat messages (no-op when write-behind is off)"""
+    if _write_behind is not None:
+        _write_behind.flush()
+
+CHAT_MESSAGES_SINCE_SQL = '''
+    SELECT id, room, sender, message, timestamp
+    FROM chat_messages
+    WHERE room = ? AND id > ?
+    ORDER BY id ASC
+    LIMIT ?
+'''
+CHAT_MESSAGES_BEFORE_SQL = '''
+    SELECT id, room, sender, message, timestamp
+    FROM chat_messages
+    WHERE room = ? AND id < ?
+    ORDER BY id DESC
+    LIMIT ?
+'''
+CHAT_MESSAGES_RECENT_SQL = '''
+    SELECT id, room, sender, message, timestamp
+    FROM chat_messages
+    WHERE room = ?
+    ORDER BY id DESC
+    LIMIT ?
+'''
+ARCHIVED_ROOM_SQL = 'SELECT 1 FROM chat_archive_rooms WHERE room = ?'
+
+def get_chat_messages(room, limit=50, since=None, before=None):
+    """Get chat messages with proper connection handling
+
+    With ``since`` set, only messages with an id greater than it are
+    returned (oldest first), so pollers can fetch just what is new. With
+    ``before`` set, the ``limit`` messages just older than that id are
+    returned (oldest first) - a keyset walk over (room, id) for scrollback
+    that continues into the archive once the live table runs out.
+    """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, room, sender, message, timestamp
-            FROM chat_messages 
-            WHERE room = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (room, limit))
+        with connection() as conn:
+            cursor = conn.cursor()
+
+            if since is not None:
+                cursor.execute(CHAT_MESSAGES_SINCE_SQL, (room, since, limit))
+                return cursor.fetchall()
+
+            if before is not None:
+                cursor.execute(CHAT_MESSAGES_BEFORE_SQL, (room, before, limit))
+            else:
+                cursor.execute(CHAT_MESSAGES_RECENT_SQL, (room, limit))
+
+            messages = cursor.fetchall()
+
+            # Reached the start of the room's live history; go on in the archive
+            if len(messages) < limit and cursor.execute(ARCHIVED_ROOM_SQL, (room,)).fetchone():
+                oldest = messages[-1]['id'] if messages else before
+                messages += _get_archived_messages(conn, room, oldest, limit - len(messages))
         
-        messages = cursor.fetchall()
         return list(reversed(messages))
         
     except sqlite3.Error as e:
-        print(f"❌ Get messages error: {e}")
+        log.error("Get messages error: %s", e, extra={'room': room})
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def get_all_clients():
     """Get all clients with proper connection handling"""
-    conn = None
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, name, phone, city, email, registered_at
-            FROM clients
-            ORDER BY registered_at DESC
-        ''')
-        
-        clients = cursor.fetchall()
+        with connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, name, phone, city, email, registered_at
+                FROM clients
+                ORDER BY registered_at DESC
+            ''')
+            
+            clients = cursor.fetchall()
         return clients
         
     except sqlite3.Error as e:
-        print(f"❌ Get clients error: {e}")
+        log.error("Get clients error: %s", e)
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def get_all_meetings():
     """Get all meetings with proper connection handling"""
-    conn = None
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT id, client_name, client_email, client_phone, client_city,
-                   advocate_name, meeting_date, meeting_time, meeting_type,
-                   meeting_duration, case_type, case_description,
-                   urgency_level, status, created_at
-            FROM meeting_bookings
-            ORDER BY created_at DESC
-        ''')
-        
-        meetings = cursor.fetchall()
+        with connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT id, client_name, client_email, client_phone, client_city,
+                       advocate_name, meeting_date, meeting_time, meeting_type,
+                       meeting_duration, case_type, case_description,
+                       urgency_level, status, created_at
+                FROM meeting_bookings
+                ORDER BY created_at DESC
+            ''')
+            
+            meetings = cursor.fetchall()
         return meetings
         
     except sqlite3.Error as e:
-        print(f"❌ Get meetings error: {e}")
+        log.error("Get meetings error: %s", e)
         return []
+
+# Meeting statuses that occupy an advocate's time
+ACTIVE_MEETING_STATUSES = ('pending', 'confirmed')
+
+_ACTIVE_STATUS_PLACEHOLDERS = ', '.join('?' for _ in ACTIVE_MEETING_STATUSES)
+ADVOCATE_LOAD_SQL = f'''
+    SELECT advocate_name, COUNT(*)
+    FROM meeting_bookings
+    WHERE meeting_date = ? AND status IN ({_ACTIVE_STATUS_PLACEHOLDERS})
+    GROUP BY advocate_name
+'''
+ADVOCATE_BOOKINGS_SQL = f'''
+    SELECT meeting_time, meeting_duration
+    FROM meeting_bookings
+    WHERE advocate_name = ? AND meeting_date = ? AND status IN ({_ACTIVE_STATUS_PLACEHOLDERS})
+'''
+
+def get_advocate_load(meeting_date):
+    """Active meetings per advocate name on one date (index-only query)"""
+    with connection() as conn:
+        rows = conn.execute(ADVOCATE_LOAD_SQL, (meeting_date, *ACTIVE_MEETING_STATUSES)).fetchall()
+    return {name: count for name, count in rows}
+
+def get_advocate_bookings(advocate_name, meeting_date, conn=None):
+    """(meeting_time, meeting_duration) of an advocate's active meetings on a date
+
+    Pass ``conn`` to read inside a caller's transaction (the booking
+    conflict check); otherwise a pooled connection is used.
+    """
+    params = (advocate_name, meeting_date, *ACTIVE_MEETING_STATUSES)
+    if conn is not None:
+        return conn.execute(ADVOCATE_BOOKINGS_SQL, params).fetchall()
+    with connection() as conn:
+        return conn.execute(ADVOCATE_BOOKINGS_SQL, params).fetchall()
+
+# Admin list columns and the sort keys each list accepts
+MEETING_COLUMNS = (
+    'id', 'client_name', 'client_email', 'client_phone', 'client_city',
+    'advocate_name', 'meeting_date', 'meeting_time', 'meeting_type', 'meeting_duration',
+    'case_type', 'case_description', 'urgency_level', 'status', 'created_at'
+)
+MEETING_SORT_KEYS = ('created_at', 'meeting_date', 'id')
+MEETING_FILTERS = ('status', 'advocate_name', 'urgency_level', 'case_type')
+
+CLIENT_COLUMNS = ('id', 'name', 'phone', 'city', 'email', 'registered_at')
+CLIENT_SORT_KEYS = ('registered_at', 'name', 'id')
+CLIENT_FILTERS = ('city',)
+
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(sort_value, row_id):
+    """Opaque keyset cursor for the row a page ended on"""
+    raw = json.dumps([sort_value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def _date_range(column, date_from, date_to, where, params):
+    """Add an inclusive YYYY-MM-DD range on a date or ISO timestamp column"""
+    if date_from:
+        where.append(f'{column} >= ?')
+        params.append(date_from)
+    if date_to:
+        try:
+            next_day = (datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)).date()
+        except ValueError:
+            raise ValueError("Dates must be YYYY-MM-DD")
+        where.append(f'{column} < ?')
+        params.append(next_day.isoformat())
+
+def _keyset_query(table, columns, where, params, sort, descending, cursor, limit):
+    """SQL and parameters for one page ordered by (sort, id), after ``cursor``"""
+    direction = 'DESC' if descending else 'ASC'
+    comparison = '<' if descending else '>'
+    where, params = list(where), list(params)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort == 'id':
+            where.append(f'id {comparison} ?')
+            params.append(row_id)
+        else:
+            where.append(f'({sort}, id) {comparison} (?, ?)')
+            params.extend([sort_value, row_id])
+
+    order = f'{sort} {direction}' if sort == 'id' else f'{sort} {direction}, id {direction}'
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {order} LIMIT ?'
+    return sql, params + [limit + 1]
+
+def _keyset_page(table, columns, where, params, sort, descending, cursor, limit):
+    """Fetch one page ordered by (sort, id), continuing after ``cursor``"""
+    sql, params = _keyset_query(table, columns, where, params, sort, descending, cursor, limit)
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    has_more = len(rows) > limit
+    rows = [dict(row) for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[-1][sort], rows[-1]['id']) if has_more else None
+    return rows, next_cursor
+
+def _count(table, where, params):
+    sql = f'SELECT COUNT(*) FROM {table}'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+def _check_page_args(sort, order, limit, sort_keys):
+    if sort not in sort_keys:
+        raise ValueError(f"sort must be one of: {', '.join(sort_keys)}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+def get_meetings_page(filters=None, date_from=None, date_to=None, sort='created_at',
+                      order='desc', cursor=None, limit=50, include_total=False):
+    """Get one keyset-paginated page of meetings
+
+    ``filters`` maps MEETING_FILTERS columns to exact values; the date range
+    applies to meeting_date. Raises ValueError for invalid arguments.
+    Returns ``(meetings, next_cursor, total)``; total is None unless asked for.
+    """
+    limit = _check_page_args(sort, order, limit, MEETING_SORT_KEYS)
+    filters = {k: v for k, v in (filters or {}).items() if k in MEETING_FILTERS and v}
+
+    where, params = [], []
+    for column, value in filters.items():
+        where.append(f'{column} = ?')
+        params.append(value)
+    _date_range('meeting_date', date_from, date_to, where, params)
+
+    rows, next_cursor = _keyset_page('meeting_bookings', MEETING_COLUMNS, where, params,
+                                     sort, order == 'desc', cursor, limit)
+
+    total = None
+    if include_total:
+        if not where:
+            total = get_stats_counters()[0].get('meetings', 0)
+        elif list(filters) == ['status'] and not (date_from or date_to):
+            total = get_stats_counters()[0].get(f"meetings:{filters['status']}", 0)
+        else:
+            total = _count('meeting_bookings', where, params)
+    return rows, next_cursor, total
+
+def get_clients_page(filters=None, date_from=None, date_to=None, sort='registered_at',
+                     order='desc', cursor=None, limit=50, include_total=False):
+    """Get one keyset-paginated page of clients
+
+    ``filters`` maps CLIENT_FILTERS columns to exact values; the date range
+    applies to registered_at. Raises ValueError for invalid arguments.
+    Returns ``(clients, next_cursor, total)``; total is None unless asked for.
+    """
+    limit = _check_page_args(sort, order, limit, CLIENT_SORT_KEYS)
+    filters = {k: v for k, v in (filters or {}).items() if k in CLIENT_FILTERS and v}
+
+    where, params = [], []
+    for column, value in filters.items():
+        where.append(f'{column} = ?')
+        params.append(value)
+    _date_range('registered_at', date_from, date_to, where, params)
+
+    rows, next_cursor = _keyset_page('clients', CLIENT_COLUMNS, where, params,
+                                     sort, order == 'desc', cursor, limit)
+
+    total = None
+    if include_total:
+        if not where:
+            total = get_stats_counters()[0].get('clients', 0)
+        else:
+            total = _count('clients', where, params)
+    return rows, next_cursor, total
+
+# ===== FULL-TEXT SEARCH =====
+
+SEARCH_BACKFILL_CHUNK = 1000
+SEARCH_BACKFILL_PAUSE = 0.05  # seconds between chunks, lets writers in
+MAX_SEARCH_RESULTS = 100
+# Deepest page offset; every page re-ranks offset+limit rows per source
+MAX_SEARCH_OFFSET = 1000
+
+# Highlight markers; callers escape the text and then swap these for markup
+HIGHLIGHT_START, HIGHLIGHT_END = '\x02', '\x03'
+
+def _backfill_chunk(fts, chunk_size):
+    """Index the next chunk of pre-existing rows; returns False when done"""
+    table, column = SEARCH_INDEXES[fts]
+    with connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute(
+            'SELECT last_id, target_id FROM search_backfill WHERE name = ?', (fts,)
+        ).fetchone()
+        if row is None or row['last_id'] >= row['target_id']:
+            conn.rollback()
+            return False
+
+        upper = min(row['last_id'] + chunk_size, row['target_id'])
+        # Rows updated since the migration were already indexed by trigger
+        conn.execute(f'''
+            INSERT INTO {fts} (rowid, {column})
+            SELECT id, COALESCE({column}, '') FROM {table}
+            WHERE id > ? AND id <= ?
+              AND NOT EXISTS (SELECT 1 FROM {fts} WHERE rowid = {table}.id)
+        ''', (row['last_id'], upper))
+        conn.execute('UPDATE search_backfill SET last_id = ? WHERE name = ?', (upper, fts))
+        conn.commit()
+        return upper < row['target_id']
+
+def backfill_search_indexes(chunk_size=SEARCH_BACKFILL_CHUNK, pause=SEARCH_BACKFILL_PAUSE):
+    """Index rows that existed before the FTS migration, one short transaction per chunk"""
+    for fts in SEARCH_INDEXES:
+        chunks = 0
+        while _backfill_chunk(fts, chunk_size):
+            chunks += 1
+            if pause:
+                time.sleep(pause)
+        if chunks:
+            log.info("Search index backfilled", extra={'event': 'search.backfilled', 'index': fts, 'chunks': chunks})
+
+def start_search_backfill():
+    """Run any pending search backfill on a background thread"""
+    if not get_search_backfill_status()['pending']:
+        return None
+    thread = threading.Thread(target=backfill_search_indexes, name='search-backfill', daemon=True)
+    thread.start()
+    return thread
+
+def get_search_backfill_status():
+    with connection() as conn:
+        rows = conn.execute('SELECT name, last_id, target_id FROM search_backfill').fetchall()
+    indexes = {row['name']: {'indexed_up_to': row['last_id'], 'target': row['target_id']} for row in rows}
+    pending = [name for name, state in indexes.items() if state['indexed_up_to'] < state['target']]
+    return {'indexes': indexes, 'pending': pending}
+
+def _match_query(text):
+    """Turn free text into an FTS5 query: every word must match, last as a prefix"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        raise ValueError("Search query is empty")
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += ' *'
+    return ' '.join(quoted)
+
+def search_chat_messages(query, room=None, date_from=None, date_to=None, limit=20, offset=0):
+    """Chat messages matching ``query``, best bm25 rank first
+
+    Archived messages are searched in the archive's own index.
+    """
+    where, params = ['chat_messages_fts MATCH ?'], [_match_query(query)]
+    if room:
+        where.append('m.room = ?')
+        params.append(room)
+    _date_range('m.timestamp', date_from, date_to, where, params)
+
+    schemas = ('main', 'archive') if _archive_in_use() else ('main',)
+    rows = []
+    with (_archive_connection() if len(schemas) > 1 else connection()) as conn:
+        for schema in schemas:
+            rows += conn.execute(f'''
+                SELECT m.id, m.room, m.sender, m.timestamp,
+                       snippet(chat_messages_fts, 0, ?, ?, '…', 16) AS snippet,
+                       bm25(chat_messages_fts) AS rank
+                FROM {schema}.chat_messages_fts
+                JOIN {schema}.chat_messages m ON m.id = chat_messages_fts.rowid
+                WHERE {' AND '.join(where)}
+                ORDER BY rank, m.id
+                LIMIT ?
+            ''', [HIGHLIGHT_START, HIGHLIGHT_END] + params + [offset + limit]).fetchall()
+    rows.sort(key=lambda row: (row['rank'], row['id']))
+    return [dict(row, type='chat') for row in rows[offset:offset + limit]]
+
+def search_meetings(query, advocate_name=None, date_from=None, date_to=None, limit=20, offset=0):
+    """Meetings whose case description matches ``query``, best bm25 rank first"""
+    where, params = ['meetings_fts MATCH ?'], [_match_query(query)]
+    if advocate_name:
+        where.append('m.advocate_name = ?')
+        params.append(advocate_name)
+    _date_range('m.meeting_date', date_from, date_to, where, params)
+
+    with connection() as conn:
+        rows = conn.execute(f'''
+            SELECT m.id, m.client_name, m.advocate_name, m.meeting_date, m.case_type, m.status,
+                   snippet(meetings_fts, 0, ?, ?, '…', 16) AS snippet,
+                   bm25(meetings_fts) AS rank
+            FROM meetings_fts
+            JOIN meeting_bookings m ON m.id = meetings_fts.rowid
+            WHERE {' AND '.join(where)}
+            ORDER BY rank, m.id
+            LIMIT ? OFFSET ?
+        ''', [HIGHLIGHT_START, HIGHLIGHT_END] + params + [limit, offset]).fetchall()
+    return [dict(row, type='meeting') for row in rows]
+
+def search_all(query, kinds=('chat', 'meeting'), room=None, advocate_name=None,
+               date_from=None, date_to=None, limit=20, offset=0):
+    """Ranked search across chat messages and case descriptions
+
+    Returns ``(results, has_more)``. Each result carries its ``type``,
+    a ``snippet`` with HIGHLIGHT_START/END around matches, and its bm25
+    ``rank`` (lower is better). Paging stops at MAX_SEARCH_OFFSET;
+    narrow the query to reach further matches.
+    """
+    if not 1 <= limit <= MAX_SEARCH_RESULTS:
+        raise ValueError(f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+    if not 0 <= offset <= MAX_SEARCH_OFFSET:
+        raise ValueError(f"offset must be between 0 and {MAX_SEARCH_OFFSET}")
+
+    # Each source returns its own top offset+limit+1; merging those is exact
+    window = offset + limit + 1
+    results = []
+    if 'chat' in kinds:
+        results += search_chat_messages(query, room, date_from, date_to, window)
+    if 'meeting' in kinds:
+        results += search_meetings(query, advocate_name, date_from, date_to, window)
+    results.sort(key=lambda r: (r['rank'], r['type'], r['id']))
+
+    page = results[offset:offset + limit]
+    return page, len(results) > offset + limit and offset + limit <= MAX_SEARCH_OFFSET
+
+# ===== STREAMING EXPORTS =====
+# Rows are read in fetchmany() batches from a dedicated connection, so an
+# export of any size holds one batch in memory and no pooled connection.
+
+EXPORT_BATCH_SIZE = 500
+
+MEETING_EXPORT_COLUMNS = MEETING_COLUMNS + ('previous_legal_action', 'special_requirements', 'updated_at')
+CHAT_EXPORT_COLUMNS = ('id', 'room', 'sender', 'message', 'timestamp')
+
+def _export_columns(columns, allowed):
+    if not columns:
+        return tuple(allowed)
+    unknown = [column for column in columns if column not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return tuple(columns)
+
+def _stream_rows(sql, params, batch_size=EXPORT_BATCH_SIZE, archive=False):
+    conn = _open_connection(check_same_thread=False)
+    try:
+        if archive:
+            _attach_archive(conn)
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield tuple(row)
     finally:
-        if conn:
-            conn.close()
+        conn.close()
+
+def _export(table, columns, where, params, date_column, date_from, date_to):
+    _date_range(date_column, date_from, date_to, where, params)
+    # With a date range, follow the date index instead of sorting every match by id
+    order = f'{date_column}, id' if (date_from or date_to) else 'id'
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {order}'
+    return columns, _stream_rows(sql, params)
+
+def export_meetings(columns=None, filters=None, date_from=None, date_to=None):
+    """Stream meetings as ``(columns, rows)``; rows is a generator of tuples
+
+    Arguments are validated before the first row is read (ValueError), so
+    callers can reject a bad request before starting the response.
+    """
+    columns = _export_columns(columns, MEETING_EXPORT_COLUMNS)
+    where, params = [], []
+    for column, value in (filters or {}).items():
+        if column in MEETING_FILTERS and value:
+            where.append(f'{column} = ?')
+            params.append(value)
+    return _export('meeting_bookings', columns, where, params, 'meeting_date', date_from, date_to)
+
+def export_clients(columns=None, filters=None, date_from=None, date_to=None):
+    """Stream clients as ``(columns, rows)``; see export_meetings()"""
+    columns = _export_columns(columns, CLIENT_COLUMNS)
+    where, params = [], []
+    for column, value in (filters or {}).items():
+        if column in CLIENT_FILTERS and value:
+            where.append(f'{column} = ?')
+            params.append(value)
+    return _export('clients', columns, where, params, 'registered_at', date_from, date_to)
+
+def export_chat_messages(room, columns=None, date_from=None, date_to=None):
+    """Stream one room's chat history in id order as ``(columns, rows)``
+
+    Archived messages come first: they are older than every live one.
+    """
+    columns = _export_columns(columns, CHAT_EXPORT_COLUMNS)
+    where, params = ['room = ?'], [room]
+    _date_range('timestamp', date_from, date_to, where, params)
+    # The (room, id) index already yields rows in id order
+    sql = f"SELECT {', '.join(columns)} FROM {{}}.chat_messages WHERE {' AND '.join(where)} ORDER BY id"
+    rows = _stream_rows(sql.format('main'), params)
+    if _archive_in_use():
+        rows = itertools.chain(_stream_rows(sql.format('archive'), params, archive=True), rows)
+    return columns, rows
+
+MEETING_STATUS_UPDATE_SQL = 'UPDATE meeting_bookings SET status = ?, updated_at = ? WHERE id = ?'
 
 def update_meeting_status(meeting_id, status):
     """Update meeting status with proper connection handling"""
-    conn = None
     try:
-        print(f"📅 Updating meeting {meeting_id} status to: {status}")
-        
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE meeting_bookings 
-            SET status = ?, updated_at = ?
-            WHERE id = ?
-        ''', (status, datetime.now().isoformat(), meeting_id))
-        
-        rows_affected = cursor.rowcount
-        conn.commit()
+        with connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(MEETING_STATUS_UPDATE_SQL, (status, datetime.now().isoformat(), meeting_id))
+            
+            rows_affected = cursor.rowcount
+            conn.commit()
         
         if rows_affected > 0:
-            print(f"✅ Meeting status updated successfully")
+            log.info("Meeting status updated", extra={'event': 'meeting.status_updated', 'meeting_id': meeting_id, 'status': status})
             return True
         else:
-            print(f"⚠️ No meeting found with ID {meeting_id}")
+            log.warning("No meeting found", extra={'event': 'meeting.not_found', 'meeting_id': meeting_id})
             return False
         
     except sqlite3.Error as e:
-        print(f"❌ Update meeting status error: {e}")
-        if conn:
-            conn.rollback()
+        log.error("Update meeting status error: %s", e, extra={'meeting_id': meeting_id})
         return False
-    finally:
-        if conn:
-            conn.close()
+
+# Allowed status changes; completed and cancelled meetings are final
+MEETING_STATUS_TRANSITIONS = {
+    'pending': ('confirmed', 'cancelled'),
+    'confirmed': ('completed', 'cancelled'),
+    'completed': (),
+    'cancelled': (),
+}
+
+def update_meeting_statuses(meeting_ids, status):
+    """Move many meetings to ``status`` in one transaction
+
+    Returns one ``{'id', 'result', 'previous_status'}`` dict per distinct
+    id, in order; result is 'updated', 'unchanged' (already in that
+    status), 'not_found' or 'invalid_transition'. Only the updated rows
+    are written, with a fresh updated_at. ValueError for an unknown
+    status; sqlite3.Error propagates and nothing is committed.
+    """
+    if status not in MEETING_STATUS_TRANSITIONS:
+        raise ValueError(f"status must be one of: {', '.join(MEETING_STATUS_TRANSITIONS)}")
+    meeting_ids = list(dict.fromkeys(meeting_ids))
+
+    with connection() as conn:
+        # Read and write under one lock so transitions are checked against current rows
+        conn.execute('BEGIN IMMEDIATE')
+        placeholders = ', '.join('?' for _ in meeting_ids)
+        current = dict(conn.execute(
+            f"SELECT id, COALESCE(status, 'pending') FROM meeting_bookings WHERE id IN ({placeholders})",
+            meeting_ids
+        ).fetchall())
+
+        results = []
+        for meeting_id in meeting_ids:
+            previous = current.get(meeting_id)
+            if previous is None:
+                result = 'not_found'
+            elif previous == status:
+                result = 'unchanged'
+            elif status in MEETING_STATUS_TRANSITIONS.get(previous, ()):
+                result = 'updated'
+            else:
+                result = 'invalid_transition'
+            results.append({'id': meeting_id, 'result': result, 'previous_status': previous})
+
+        now = datetime.now().isoformat()
+        conn.executemany(
+            MEETING_STATUS_UPDATE_SQL,
+            [(status, now, r['id']) for r in results if r['result'] == 'updated']
+        )
+        conn.commit()
+
+    return results
 
 def get_database_stats():
-    """Get database statistics with proper connection handling"""
-    conn = None
+    """Get database statistics from the trigger-maintained counters"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Get counts
-        cursor.execute("SELECT COUNT(*) FROM clients")
-        clients_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings")
-        meetings_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings WHERE status = 'pending'")
-        pending_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings WHERE status = 'confirmed'")
-        confirmed_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM chat_messages")
-        messages_count = cursor.fetchone()[0]
-        
-        # Get today's stats
-        today = datetime.now().date().isoformat()
-        cursor.execute("SELECT COUNT(*) FROM meeting_bookings WHERE date(meeting_date) = ?", (today,))
-        today_meetings = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM clients WHERE date(registered_at) = ?", (today,))
-        today_clients = cursor.fetchone()[0]
+        totals, daily = get_stats_counters()
         
         return {
-            'total_clients': clients_count,
-            'total_meetings': meetings_count,
-            'pending_meetings': pending_count,
-            'confirmed_meetings': confirmed_count,
-            'total_messages': messages_count,
-            'today_meetings': today_meetings,
-            'today_clients': today_clients
+            'total_clients': totals.get('clients', 0),
+            'total_meetings': totals.get('meetings', 0),
+            'pending_meetings': totals.get('meetings:pending', 0),
+            'confirmed_meetings': totals.get('meetings:confirmed', 0),
+            'total_messages': totals.get('messages', 0),
+            'today_meetings': daily.get('meetings', 0),
+            'today_clients': daily.get('clients', 0)
         }
         
     except sqlite3.Error as e:
-        print(f"❌ Get stats error: {e}")
+        log.error("Get stats error: %s", e)
         return {
             'total_clients': 0,
             'total_meetings': 0,
@@ -338,12 +1581,499 @@ def get_database_stats():
             'today_meetings': 0,
             'today_clients': 0
         }
+
+# ===== CHAT RETENTION =====
+# Old messages move to a separate archive database so chat_messages (and
+# its indexes) stay roughly the size of the retention window. Scrollback
+# continues into the archive through get_chat_messages(before=...).
+
+VACUUM_PAGES_PER_BATCH = 256
+CHAT_ARCHIVE_PAUSE = 0.05  # seconds between batches, lets writers in
+
+_retention_lock = threading.Lock()
+_retention_stats = {'archived': 0, 'runs': 0, 'last_run': None, 'last_error': None}
+
+def get_archive_path():
+    return CHAT_ARCHIVE_PATH or os.path.splitext(DB_PATH)[0] + '_archive.db'
+
+def _attach_archive(conn):
+    """Attach the archive database to ``conn`` as ``archive`` (once per connection)"""
+    if any(row[1] == 'archive' for row in conn.execute('PRAGMA database_list')):
+        return
+    conn.execute('ATTACH DATABASE ? AS archive', (get_archive_path(),))
+    conn.execute('PRAGMA archive.journal_mode=WAL')
+    conn.execute('BEGIN IMMEDIATE')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive.chat_messages (
+            id INTEGER PRIMARY KEY,
+            room TEXT NOT NULL,
+            sender TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS archive.idx_chat_room_id ON chat_messages(room, id)')
+    # The archive's own search index keeps archived text out of chat.db
+    if not conn.execute(
+            "SELECT 1 FROM archive.sqlite_master WHERE name = 'chat_messages_fts'").fetchone():
+        conn.execute(f"CREATE VIRTUAL TABLE archive.chat_messages_fts USING fts5(message, tokenize='{SEARCH_TOKENIZER}')")
+        # Archives written before it existed
+        conn.execute('INSERT INTO archive.chat_messages_fts (rowid, message) SELECT id, message FROM archive.chat_messages')
+    conn.commit()
+
+@contextmanager
+def _archive_connection():
+    """A pooled connection with the archive attached; it stays attached for later borrowers"""
+    with connection() as conn:
+        _attach_archive(conn)
+        yield conn
+
+CHAT_ARCHIVE_BATCH_SQL = '''
+    SELECT id FROM main.chat_messages
+    WHERE timestamp < ? ORDER BY timestamp LIMIT ?
+'''
+
+def _archive_in_use():
+    return CHAT_RETENTION_DAYS > 0 or os.path.exists(get_archive_path())
+
+def _get_archived_messages(conn, room, before=None, limit=50):
+    """Archived messages of a room older than ``before``, newest first"""
+    _attach_archive(conn)
+    if before is None:
+        return conn.execute('''
+            SELECT id, room, sender, message, timestamp
+            FROM archive.chat_messages
+            WHERE room = ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (room, limit)).fetchall()
+    return conn.execute('''
+        SELECT id, room, sender, message, timestamp
+        FROM archive.chat_messages
+        WHERE room = ? AND id < ?
+        ORDER BY id DESC
+        LIMIT ?
+    ''', (room, before, limit)).fetchall()
+
+def archive_chat_messages(days=None, batch_size=CHAT_ARCHIVE_BATCH_SIZE, pause=CHAT_ARCHIVE_PAUSE):
+    """Move chat messages older than ``days`` into the archive; returns how many
+
+    Each batch is committed to the archive (keyed by id, so a repeat is
+    harmless) before a second transaction deletes the copied rows here,
+    which makes an interrupted or concurrent run safe. Search entries move
+    to the archive's own index along with the rows, and the delete runs
+    under ARCHIVE_GUARD so archived messages keep their stats counts.
+    Freed pages are handed back to the filesystem a batch at a time by
+    incremental vacuum.
+    """
+    days = CHAT_RETENTION_DAYS if days is None else days
+    if days <= 0:
+        return 0
+
+    cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+    moved = 0
+    try:
+        while True:
+            with _archive_connection() as conn:
+                ids = [row[0] for row in conn.execute(CHAT_ARCHIVE_BATCH_SQL, (cutoff, batch_size))]
+                if not ids:
+                    break
+                placeholders = ', '.join('?' for _ in ids)
+
+                # Rows and their search entries, in one archive transaction
+                conn.execute(f'''
+                    INSERT INTO archive.chat_messages_fts (rowid, message)
+                    SELECT id, message FROM main.chat_messages
+                    WHERE id IN ({placeholders}) AND id NOT IN (SELECT id FROM archive.chat_messages)
+                ''', ids)
+                conn.execute(f'''
+                    INSERT OR IGNORE INTO archive.chat_messages (id, room, sender, message, timestamp)
+                    SELECT id, room, sender, message, timestamp FROM main.chat_messages
+                    WHERE id IN ({placeholders})
+                ''', ids)
+                conn.commit()
+
+                # Only rows now in the archive are deleted
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('INSERT INTO chat_archiving (active) VALUES (1)')
+                conn.execute(f'''
+                    INSERT OR IGNORE INTO chat_archive_rooms (room)
+                    SELECT DISTINCT room FROM main.chat_messages WHERE id IN ({placeholders})
+                ''', ids)
+                conn.execute(f'''
+                    DELETE FROM main.chat_messages
+                    WHERE id IN ({placeholders}) AND id IN (SELECT id FROM archive.chat_messages)
+                ''', ids)
+                conn.execute('DELETE FROM chat_archiving')
+                conn.commit()
+                # executescript steps the pragma to completion (execute frees one page)
+                conn.executescript(f'PRAGMA incremental_vacuum({VACUUM_PAGES_PER_BATCH})')
+
+            moved += len(ids)
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
     finally:
-        if conn:
+        with _retention_lock:
+            _retention_stats['archived'] += moved
+            _retention_stats['runs'] += 1
+            _retention_stats['last_run'] = datetime.now().isoformat()
+
+    if moved:
+        log.info("Chat messages archived", extra={'event': 'chat.archived', 'moved': moved, 'cutoff': cutoff})
+    return moved
+
+def _run_chat_retention(interval):
+    while True:
+        try:
+            archive_chat_messages()
+            error = None
+        except sqlite3.Error as e:
+            log.error("Chat archive error: %s", e, extra={'event': 'chat.archive_failed'})
+            error = str(e)
+        with _retention_lock:
+            _retention_stats['last_error'] = error
+        time.sleep(interval)
+
+def start_chat_retention(interval=CHAT_ARCHIVE_INTERVAL):
+    """Archive old chat messages now and every ``interval`` seconds on a background thread"""
+    if CHAT_RETENTION_DAYS <= 0:
+        return None
+    thread = threading.Thread(target=_run_chat_retention, args=(interval,), name='chat-retention', daemon=True)
+    thread.start()
+    return thread
+
+def get_chat_retention_stats():
+    with connection() as conn:
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    with _retention_lock:
+        stats = dict(_retention_stats)
+    stats.update({
+        'retention_days': CHAT_RETENTION_DAYS,
+        'archive_path': get_archive_path(),
+        'incremental_vacuum': auto_vacuum == 2,
+        'free_pages': free_pages
+    })
+    return stats
+
+def enable_incremental_vacuum():
+    """Switch an existing database to auto_vacuum=INCREMENTAL (one full VACUUM)"""
+    try:
+        conn = get_connection()
+        try:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+                print("✅ Incremental vacuum already enabled")
+                return True
+            print("🔄 Rewriting database with auto_vacuum=INCREMENTAL...")
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        finally:
             conn.close()
 
+        print("✅ Incremental vacuum enabled")
+        return True
+
+    except sqlite3.Error as e:
+        print(f"❌ Vacuum error: {e}")
+        return False
+
+# ===== SHARED REALTIME STATE =====
+# Backing store for state.SQLiteState: WebRTC signals and presence kept in
+# SQLite so every worker process on the host sees the same rooms.
+
+SIGNAL_BROADCAST = '*'
+
+def get_last_chat_message_id():
+    with connection() as conn:
+        row = conn.execute('SELECT MAX(id) FROM chat_messages').fetchone()
+    return row[0] or 0
+
+CHAT_FEED_SQL = (
+    'SELECT id, room, sender, message, timestamp FROM chat_messages '
+    'WHERE id > ? ORDER BY id ASC LIMIT ?'
+)
+
+def get_chat_messages_after(last_id, limit=500):
+    """Messages of every room with an id above ``last_id``, oldest first"""
+    with connection() as conn:
+        return conn.execute(CHAT_FEED_SQL, (last_id, limit)).fetchall()
+
+def _signal(row):
+    signal = json.loads(row['payload'])
+    signal['seq'] = row['seq']
+    return signal
+
+def post_signal(room, signal, room_cap):
+    """Queue a signal for its recipient, evicting beyond ``room_cap``; returns its seq"""
+    with connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        cursor = conn.execute(
+            'INSERT INTO rtc_signals (room, recipient, sender, payload) VALUES (?, ?, ?, ?)',
+            (room, signal.get('to') or SIGNAL_BROADCAST, signal.get('from'), json.dumps(signal))
+        )
+        conn.execute('''
+            DELETE FROM rtc_signals WHERE room = ? AND seq <= (
+                SELECT seq FROM rtc_signals WHERE room = ? ORDER BY seq DESC LIMIT 1 OFFSET ?
+            )
+        ''', (room, room, room_cap))
+        conn.commit()
+    signal['seq'] = cursor.lastrowid
+    return signal['seq']
+
+SIGNAL_CURSOR_SQL = 'SELECT MAX(seq) FROM rtc_signals WHERE room = ?'
+SIGNALS_SINCE_SQL = '''
+    SELECT seq, payload FROM rtc_signals
+    WHERE room = ? AND seq > ? AND seq <= ?
+      AND (recipient = ? OR (recipient = ? AND COALESCE(sender, '') != ?))
+    ORDER BY seq
+'''
+
+def fetch_signals(room, user_id, after=0):
+    """Signals for ``user_id`` newer than ``after`` and the next cursor
+
+    Same contract as SignalStore.fetch: the user's own signals up to
+    ``after`` are acknowledged and deleted. The delete only runs when
+    there is something to acknowledge, so idle polls stay read-only.
+    """
+    with connection() as conn:
+        if after and conn.execute(
+                'SELECT 1 FROM rtc_signals WHERE room = ? AND seq <= ? AND recipient = ? LIMIT 1',
+                (room, after, user_id)).fetchone():
+            conn.execute('DELETE FROM rtc_signals WHERE room = ? AND seq <= ? AND recipient = ?',
+                         (room, after, user_id))
+            conn.commit()
+        # Cursor first, then only rows up to it: a signal committed in
+        # between is left for the next fetch instead of skipped
+        last = max(after, conn.execute(SIGNAL_CURSOR_SQL, (room,)).fetchone()[0] or 0)
+        rows = conn.execute(
+            SIGNALS_SINCE_SQL, (room, after, last, user_id, SIGNAL_BROADCAST, user_id)
+        ).fetchall()
+    return [_signal(row) for row in rows], last
+
+def recent_signals(room, limit=20):
+    with connection() as conn:
+        rows = conn.execute(
+            'SELECT seq, payload FROM rtc_signals WHERE room = ? ORDER BY seq DESC LIMIT ?',
+            (room, limit)
+        ).fetchall()
+    return [_signal(row) for row in reversed(rows)]
+
+def get_signal_depth(room):
+    with connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM rtc_signals WHERE room = ?', (room,)).fetchone()[0]
+
+def get_signal_stats():
+    with connection() as conn:
+        depths = [row[0] for row in conn.execute('SELECT COUNT(*) FROM rtc_signals GROUP BY room')]
+    return {'rooms': len(depths), 'signals': sum(depths), 'max_room_depth': max(depths, default=0)}
+
+def drop_signal_room(room):
+    with connection() as conn:
+        conn.execute('DELETE FROM rtc_signals WHERE room = ?', (room,))
+        conn.commit()
+
+def presence_join(room, username, user_id, expires_at):
+    """Add a user to a room (or refresh one with the same name); returns (user_id, joined)"""
+    with connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('''
+            INSERT INTO rtc_rooms (room, empty_until) VALUES (?, NULL)
+            ON CONFLICT(room) DO UPDATE SET empty_until = NULL
+        ''', (room,))
+        existing = conn.execute(
+            'SELECT user_id FROM rtc_presence WHERE room = ? AND username = ?', (room, username)
+        ).fetchone()
+        if existing is not None:
+            conn.execute('UPDATE rtc_presence SET expires_at = ? WHERE room = ? AND user_id = ?',
+                         (expires_at, room, existing['user_id']))
+            conn.commit()
+            return existing['user_id'], False
+        # Same id under a new name replaces the old entry
+        conn.execute('''
+            INSERT OR REPLACE INTO rtc_presence (room, user_id, username, joined_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (room, user_id, username, datetime.now().isoformat(), expires_at))
+        conn.commit()
+        return user_id, True
+
+def presence_heartbeat(room, user_id, expires_at):
+    with connection() as conn:
+        updated = conn.execute('UPDATE rtc_presence SET expires_at = ? WHERE room = ? AND user_id = ?',
+                               (expires_at, room, user_id)).rowcount
+        conn.commit()
+    return updated > 0
+
+def _presence_user(row):
+    return {'id': row['user_id'], 'username': row['username'],
+            'joined_at': row['joined_at'], 'status': 'connected'}
+
+def _close_if_empty(conn, room, empty_until):
+    conn.execute('''
+        UPDATE rtc_rooms SET empty_until = ?
+        WHERE room = ? AND empty_until IS NULL
+          AND NOT EXISTS (SELECT 1 FROM rtc_presence WHERE room = ?)
+    ''', (empty_until, room, room))
+
+def presence_leave(room, user_id, empty_until):
+    """Remove a user; returns their info, or None if they were not in the room"""
+    with connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute(
+            'DELETE FROM rtc_presence WHERE room = ? AND user_id = ? '
+            'RETURNING user_id, username, joined_at', (room, user_id)
+        ).fetchone()
+        if row is not None:
+            _close_if_empty(conn, room, empty_until)
+        conn.commit()
+    return _presence_user(row) if row is not None else None
+
+def presence_touch(room, empty_until):
+    """Make sure a room exists; a new room starts out empty"""
+    with connection() as conn:
+        conn.execute('INSERT INTO rtc_rooms (room, empty_until) VALUES (?, ?) ON CONFLICT(room) DO NOTHING',
+                     (room, empty_until))
+        conn.commit()
+
+def presence_has_room(room):
+    with connection() as conn:
+        return conn.execute('SELECT 1 FROM rtc_rooms WHERE room = ?', (room,)).fetchone() is not None
+
+PRESENCE_USERS_SQL = 'SELECT user_id, username, joined_at FROM rtc_presence WHERE room = ?'
+
+def presence_users(room):
+    with connection() as conn:
+        rows = conn.execute(PRESENCE_USERS_SQL, (room,)).fetchall()
+    # A handful of rows; sorting here keeps the lookup on the primary key
+    return [_presence_user(row) for row in sorted(rows, key=lambda row: row['joined_at'])]
+
+def get_presence_counts():
+    """(rooms, users) across all processes"""
+    with connection() as conn:
+        rooms = conn.execute('SELECT COUNT(*) FROM rtc_rooms').fetchone()[0]
+        users = conn.execute('SELECT COUNT(*) FROM rtc_presence').fetchone()[0]
+    return rooms, users
+
+def next_presence_deadline():
+    """Earliest user timeout or empty-room expiry, or None"""
+    with connection() as conn:
+        users = conn.execute('SELECT MIN(expires_at) FROM rtc_presence').fetchone()[0]
+        rooms = conn.execute('SELECT MIN(empty_until) FROM rtc_rooms').fetchone()[0]
+    deadlines = [d for d in (users, rooms) if d is not None]
+    return min(deadlines) if deadlines else None
+
+def reap_presence(now, room_ttl):
+    """Remove timed-out users and expired empty rooms (with their signals)
+
+    Rows are claimed with DELETE ... RETURNING in one write transaction,
+    so when several processes sweep at once each user is reported by
+    exactly one of them. Returns ``(expired, closed)``: a list of
+    ``(room, user)`` pairs and a list of closed room ids.
+    """
+    with connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        expired = [(row['room'], _presence_user(row)) for row in conn.execute(
+            'DELETE FROM rtc_presence WHERE expires_at <= ? '
+            'RETURNING room, user_id, username, joined_at', (now,)
+        ).fetchall()]
+        for room in {room for room, _ in expired}:
+            _close_if_empty(conn, room, now + room_ttl)
+        closed = [row['room'] for row in conn.execute(
+            'DELETE FROM rtc_rooms WHERE empty_until <= ? RETURNING room', (now,)
+        ).fetchall()]
+        for room in closed:
+            conn.execute('DELETE FROM rtc_signals WHERE room = ?', (room,))
+        conn.commit()
+    return expired, closed
+
 # Test connection
+# ===== QUERY PLAN CHECKS =====
+# Hot queries with sample parameters, built from the same SQL the query
+# functions run; check_query_plans() fails on any full table or index scan
+# or temporary B-tree sort in their plans.
+
+_SAMPLE_CURSOR = encode_cursor('9999', 0)
+
+HOT_QUERIES = {
+    'recent chat messages': (CHAT_MESSAGES_RECENT_SQL, ('room', 50)),
+    'chat messages since cursor': (CHAT_MESSAGES_SINCE_SQL, ('room', 0, 50)),
+    'chat scrollback': (CHAT_MESSAGES_BEFORE_SQL, ('room', 1000, 50)),
+    'archived room': (ARCHIVED_ROOM_SQL, ('room',)),
+    'room version': (ROOM_VERSION_SQL, ('room',)),
+    'chat feed': (CHAT_FEED_SQL, (0, 500)),
+    'webrtc signal cursor': (SIGNAL_CURSOR_SQL, ('room',)),
+    'webrtc signals since cursor': (
+        SIGNALS_SINCE_SQL, ('room', 0, 100, 'user', SIGNAL_BROADCAST, 'user')),
+    'webrtc room users': (PRESENCE_USERS_SQL, ('room',)),
+    'stats counters': (STATS_COUNTERS_SQL, ('2025-01-01',)),
+    'change versions': (CHANGE_VERSIONS_SQL, VERSIONED_TABLES),
+    'client refresh': (CLIENT_REFRESH, ('name', '', '', '', 'phone:9876543210')),
+    'meetings page': _keyset_query(
+        'meeting_bookings', MEETING_COLUMNS, [], [], 'created_at', True, _SAMPLE_CURSOR, 50),
+    'meetings page by status': _keyset_query(
+        'meeting_bookings', MEETING_COLUMNS, ['status = ?'], ['pending'],
+        'created_at', True, _SAMPLE_CURSOR, 50),
+    'meetings by advocate and date': _keyset_query(
+        'meeting_bookings', MEETING_COLUMNS, ['advocate_name = ?', 'meeting_date >= ?'],
+        ['name', '2025-01-01'], 'meeting_date', False, None, 50),
+    'clients page': _keyset_query(
+        'clients', CLIENT_COLUMNS, [], [], 'registered_at', True, _SAMPLE_CURSOR, 50),
+    'advocate load': (ADVOCATE_LOAD_SQL, ('2025-01-01', *ACTIVE_MEETING_STATUSES)),
+    'advocate bookings': (ADVOCATE_BOOKINGS_SQL, ('name', '2025-01-01', *ACTIVE_MEETING_STATUSES)),
+    'chat retention batch': (CHAT_ARCHIVE_BATCH_SQL, ('2025-01-01', 500)),
+    'meeting status update': (MEETING_STATUS_UPDATE_SQL, ('confirmed', '', 0)),
+}
+
+def check_query_plans():
+    """EXPLAIN QUERY PLAN every hot query; returns a list of problems found"""
+    problems = []
+    with connection() as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+            for step in plan:
+                # A SCAN reads the whole table or index, even "USING INDEX"
+                if step.startswith('SCAN') or 'TEMP B-TREE' in step:
+                    problems.append(f"{name}: {step}")
+    return problems
+
 if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild-stats':
+        # Reconcile stats_counters with the base tables
+        sys.exit(0 if rebuild_stats_counters() else 1)
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'backfill-search':
+        # Index pre-existing rows now instead of on the background thread
+        init_database()
+        backfill_search_indexes(pause=0)
+        print("📈 Search backfill:", get_search_backfill_status())
+        sys.exit(0)
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'archive-chat':
+        # Move messages older than N days (default CHAT_RETENTION_DAYS) to the archive
+        init_database()
+        days = int(sys.argv[2]) if len(sys.argv) > 2 else CHAT_RETENTION_DAYS
+        print(f"📦 Archived {archive_chat_messages(days, pause=0)} message(s) to {get_archive_path()}")
+        sys.exit(0)
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'vacuum':
+        # One-off rewrite so archived space is returned to the filesystem
+        init_database()
+        sys.exit(0 if enable_incremental_vacuum() else 1)
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'check-plans':
+        # Fail if a hot query regressed to a full scan or temp B-tree sort
+        init_database()
+        problems = check_query_plans()
+        for problem in problems:
+            print(f"❌ {problem}")
+        print("✅ All hot query plans use indexes" if not problems else f"❌ {len(problems)} plan problem(s)")
+        sys.exit(1 if problems else 0)
+    
     print("🧪 Testing database...")
     init_database()
+    print("📊 Pool stats:", get_pool_stats())
+    print("📈 Stats:", get_database_stats())
     print("✅ Database test completed!")
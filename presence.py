@@ -0,0 +1,243 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+
+from applog import get_logger
+
+log = get_logger('presence')
+
+# Users who neither join nor poll for this long are dropped from their room
+USER_TIMEOUT = 30  # seconds
+# An empty room (and its queued signals) is kept this long for rejoins
+EMPTY_ROOM_TTL = 30  # seconds
+
+class _Room:
+    __slots__ = ('users', 'by_name', 'token', 'snapshot')
+
+    def __init__(self):
+        self.users = {}       # user id -> _User
+        self.by_name = {}     # username -> user id
+        self.token = None     # expiry timer of the room while it is empty
+        self.snapshot = None  # cached public user list
+
+class _User:
+    __slots__ = ('info', 'deadline', 'token')
+
+    def __init__(self, info, deadline, token):
+        self.info = info
+        self.deadline = deadline
+        self.token = token
+
+class PresenceTracker:
+    """Who is in which WebRTC room, expired from a timer heap.
+
+    A join or heartbeat only moves the user's deadline (O(1)). Each user
+    and each empty room has at most one entry in a heap of deadlines; a
+    background thread sleeps until the earliest one. A user whose entry
+    fires but who has heartbeated since is simply rescheduled; entries of
+    users who left or rooms that filled up again are discarded when they
+    fire.
+
+    ``on_user_expired(room_id, user)`` and ``on_room_closed(room_id)`` run
+    on the expiry thread, outside the tracker's lock.
+    """
+
+    def __init__(self, user_timeout=USER_TIMEOUT, room_ttl=EMPTY_ROOM_TTL,
+                 on_user_expired=None, on_room_closed=None, clock=time.monotonic):
+        self.user_timeout = user_timeout
+        self.room_ttl = room_ttl
+        self.on_user_expired = on_user_expired
+        self.on_room_closed = on_room_closed
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._rooms = {}
+        self._heap = []
+        self._tokens = itertools.count()
+        self._expired_users = 0
+        self._closed_rooms = 0
+        self._thread = None
+        self._stopping = False
+
+    def __len__(self):
+        return len(self._rooms)
+
+    # ----- timers (caller holds the lock) -----
+
+    def _schedule(self, deadline, room_id, user_id, token):
+        if not self._heap or deadline < self._heap[0][0]:
+            self._cond.notify()
+        heapq.heappush(self._heap, (deadline, token, room_id, user_id))
+
+    def _room(self, room_id, empty=True):
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = _Room()
+            if empty:
+                self._schedule_close(room_id, room)
+        return room
+
+    def _schedule_close(self, room_id, room):
+        room.token = next(self._tokens)
+        self._schedule(self.clock() + self.room_ttl, room_id, None, room.token)
+
+    def _remove(self, room_id, room, user_id):
+        user = room.users.pop(user_id)
+        if room.by_name.get(user.info['username']) == user_id:
+            del room.by_name[user.info['username']]
+        room.snapshot = None
+        if not room.users:
+            self._schedule_close(room_id, room)
+        return user.info
+
+    # ----- public API -----
+
+    def join(self, room_id, username, user_id):
+        """Add a user (or refresh one already there under ``username``)
+
+        Returns ``(user_id, joined)``; ``joined`` is False for a refresh.
+        """
+        with self._cond:
+            room = self._room(room_id, empty=False)
+            now = self.clock()
+            existing = room.by_name.get(username)
+            if existing is not None:
+                room.users[existing].deadline = now + self.user_timeout
+                return existing, False
+            if user_id in room.users:
+                # Same id under a new name: replace the old entry
+                self._remove(room_id, room, user_id)
+            token = next(self._tokens)
+            room.users[user_id] = _User({
+                'id': user_id,
+                'username': username,
+                'joined_at': datetime.now().isoformat(),
+                'status': 'connected'
+            }, now + self.user_timeout, token)
+            room.by_name[username] = user_id
+            room.token = None  # no longer empty
+            room.snapshot = None
+            self._schedule(now + self.user_timeout, room_id, user_id, token)
+            return user_id, True
+
+    def heartbeat(self, room_id, user_id):
+        """Push back a user's timeout; False if they are not in the room"""
+        with self._cond:
+            room = self._rooms.get(room_id)
+            user = room.users.get(user_id) if room else None
+            if user is None:
+                return False
+            user.deadline = self.clock() + self.user_timeout
+            return True
+
+    def leave(self, room_id, user_id):
+        """Remove a user; returns their info, or None if they were not there"""
+        with self._cond:
+            room = self._rooms.get(room_id)
+            if room is None or user_id not in room.users:
+                return None
+            return self._remove(room_id, room, user_id)
+
+    def touch(self, room_id):
+        """Make sure a room exists, e.g. when a signal is posted to it"""
+        with self._cond:
+            self._room(room_id)
+
+    def has_room(self, room_id):
+        return room_id in self._rooms
+
+    def users(self, room_id):
+        """Public user dicts of a room; the list is shared, do not mutate it"""
+        with self._cond:
+            room = self._rooms.get(room_id)
+            if room is None:
+                return []
+            if room.snapshot is None:
+                room.snapshot = [user.info for user in room.users.values()]
+            return room.snapshot
+
+    def user_count(self):
+        with self._cond:
+            return sum(len(room.users) for room in self._rooms.values())
+
+    def stats(self):
+        with self._cond:
+            return {
+                'rooms': len(self._rooms),
+                'users': sum(len(room.users) for room in self._rooms.values()),
+                'timers': len(self._heap),
+                'expired_users': self._expired_users,
+                'closed_rooms': self._closed_rooms
+            }
+
+    # ----- expiry -----
+
+    def _collect_expired(self, now):
+        # Caller holds the lock
+        expired, closed = [], []
+        while self._heap and self._heap[0][0] <= now:
+            _, token, room_id, user_id = heapq.heappop(self._heap)
+            room = self._rooms.get(room_id)
+            if room is None:
+                continue
+            if user_id is None:
+                if room.token == token and not room.users:
+                    del self._rooms[room_id]
+                    closed.append(room_id)
+                continue
+            user = room.users.get(user_id)
+            if user is None or user.token != token:
+                continue  # left or rejoined since this timer was set
+            if user.deadline > now:
+                heapq.heappush(self._heap, (user.deadline, token, room_id, user_id))
+                continue
+            expired.append((room_id, self._remove(room_id, room, user_id)))
+        self._expired_users += len(expired)
+        self._closed_rooms += len(closed)
+        return expired, closed
+
+    def expire(self, now=None):
+        """Drop users and empty rooms whose time is up; returns how many of each"""
+        with self._cond:
+            expired, closed = self._collect_expired(self.clock() if now is None else now)
+        for room_id, user in expired:
+            if self.on_user_expired:
+                self.on_user_expired(room_id, user)
+        for room_id in closed:
+            if self.on_room_closed:
+                self.on_room_closed(room_id)
+        return len(expired), len(closed)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    timeout = self._heap[0][0] - self.clock() if self._heap else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+            try:
+                self.expire()
+            except Exception:
+                # A failing callback must not stop expiry for everyone else
+                log.exception("Presence expiry callback failed")
+
+    def start(self):
+        """Run expiry on a daemon thread (idempotent)"""
+        with self._cond:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='presence-expiry', daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
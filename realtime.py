@@ -0,0 +1,129 @@
+import queue
+import threading
+from collections import OrderedDict
+
+# Rooms whose newest message id is remembered; the least recently active
+# rooms without waiters are forgotten beyond this
+MAX_TRACKED_ROOMS = 1000
+
+class ChatNotifier:
+    """Wakes long-poll requests when a new message is accepted for their room.
+
+    Tracks the newest message id seen per recently active room so a waiter
+    holding a ``since`` cursor can tell immediately whether it is already
+    behind.
+    """
+
+    def __init__(self, max_rooms=MAX_TRACKED_ROOMS):
+        self._lock = threading.Lock()
+        self.max_rooms = max_rooms
+        self._latest = OrderedDict()
+        self._conditions = {}
+        self._waiters = {}
+
+    def latest_id(self, room):
+        with self._lock:
+            return self._latest.get(room, 0)
+
+    def notify(self, room, message_id):
+        """Record a new message id for a room and wake its waiters"""
+        with self._lock:
+            if message_id > self._latest.get(room, 0):
+                self._latest[room] = message_id
+                self._latest.move_to_end(room)
+                self._prune()
+            condition = self._conditions.get(room)
+            if condition is not None:
+                condition.notify_all()
+
+    def _prune(self):
+        # Waiters re-check their room's entry, so only idle rooms are dropped
+        excess = len(self._latest) - self.max_rooms
+        if excess <= 0:
+            return
+        idle = []
+        for room in self._latest:
+            if room not in self._waiters:
+                idle.append(room)
+                if len(idle) == excess:
+                    break
+        for room in idle:
+            del self._latest[room]
+
+    def wait(self, room, since, timeout):
+        """Block until a message newer than ``since`` exists or timeout passes"""
+        with self._lock:
+            if self._latest.get(room, 0) > since:
+                return True
+            condition = self._conditions.get(room)
+            if condition is None:
+                condition = self._conditions[room] = threading.Condition(self._lock)
+            self._waiters[room] = self._waiters.get(room, 0) + 1
+            try:
+                return condition.wait_for(lambda: self._latest.get(room, 0) > since, timeout)
+            finally:
+                self._waiters[room] -= 1
+                if not self._waiters[room]:
+                    del self._waiters[room]
+                    del self._conditions[room]
+
+# Messages buffered per SSE subscriber before it is considered too slow
+SUBSCRIBER_QUEUE_SIZE = 100
+
+class Subscription:
+    """A single stream subscriber with its own bounded message queue"""
+
+    def __init__(self, room, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.room = room
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def get(self, timeout):
+        """Next queued message, or None if nothing arrives within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class RoomBroadcaster:
+    """Per-process registry of stream and socket subscribers, keyed by room.
+
+    Publishing never blocks: a subscriber whose queue is full is marked as
+    dropped and removed, and its stream ends so the client reconnects and
+    resumes from the database (Last-Event-ID or its ``since`` cursor).
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, room):
+        subscription = Subscription(room, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(room, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.room)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.room]
+
+    def publish(self, room, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(room, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                subscription.dropped = True
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, room=None):
+        with self._lock:
+            if room is not None:
+                return len(self._subscribers.get(room, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
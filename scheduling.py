@@ -0,0 +1,63 @@
+from bisect import bisect_left
+from itertools import accumulate
+
+# Bookable start times offered by the meeting form (24h, local time)
+SLOT_TIMES = (
+    '09:00', '09:30', '10:00', '10:30', '11:00', '11:30',
+    '12:00', '14:00', '14:30', '15:00', '15:30', '16:00',
+    '16:30', '17:00', '17:30', '18:00'
+)
+DEFAULT_DURATION = 45  # minutes
+MAX_DURATION = 240
+
+def to_minutes(time_text):
+    """Minutes after midnight for an 'HH:MM' time; ValueError if malformed"""
+    hours, _, minutes = str(time_text).partition(':')
+    hours, minutes = int(hours), int(minutes[:2])
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"invalid time: {time_text}")
+    return hours * 60 + minutes
+
+def parse_duration(duration):
+    """Meeting length in minutes; ValueError outside 1..MAX_DURATION"""
+    minutes = int(duration or DEFAULT_DURATION)
+    if not 0 < minutes <= MAX_DURATION:
+        raise ValueError(f"duration must be between 1 and {MAX_DURATION} minutes")
+    return minutes
+
+class DayIntervals:
+    """Sorted busy intervals of one advocate on one day.
+
+    Intervals are kept ordered by start with a running maximum of their
+    ends, so an overlap test is a single binary search even if legacy
+    bookings overlap each other.
+    """
+
+    def __init__(self, bookings):
+        intervals = []
+        for meeting_time, duration in bookings:
+            try:
+                start = to_minutes(meeting_time)
+                intervals.append((start, start + parse_duration(duration)))
+            except ValueError:
+                continue  # unparseable legacy rows can't block a slot
+        intervals.sort()
+        self.starts = [start for start, _ in intervals]
+        self.max_ends = list(accumulate((end for _, end in intervals), max))
+
+    def overlaps(self, start, end):
+        # Intervals starting before ``end`` are a prefix of the sorted list
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+    def conflicts_with(self, meeting_time, duration):
+        start = to_minutes(meeting_time)
+        return self.overlaps(start, start + parse_duration(duration))
+
+    def slots(self, duration=DEFAULT_DURATION, slot_times=SLOT_TIMES):
+        """Every offered start time with whether ``duration`` fits there"""
+        minutes = parse_duration(duration)
+        return [
+            {"time": time, "available": not self.overlaps(to_minutes(time), to_minutes(time) + minutes)}
+            for time in slot_times
+        ]
@@ -0,0 +1,110 @@
+import heapq
+import threading
+from collections import deque
+
+# Hard cap on signals held per room across all mailboxes
+ROOM_SIGNAL_CAP = 200
+
+# Mailbox key for signals sent without a ``to`` recipient
+BROADCAST = '*'
+
+class SignalStore:
+    """Per-recipient WebRTC signal mailboxes with room-wide sequence numbers.
+
+    Every signal posted to a room gets the next sequence number for that room
+    and lands in the mailbox of its ``to`` recipient (or the broadcast mailbox).
+    A poller fetches with ``after=<seq>``; that cursor doubles as an
+    acknowledgment, so signals it covers are dropped from the poller's own
+    mailbox. When a room exceeds ``room_cap`` signals the oldest are evicted.
+    """
+
+    def __init__(self, room_cap=ROOM_SIGNAL_CAP):
+        self.room_cap = room_cap
+        self._lock = threading.Lock()
+        self._rooms = {}
+
+    def _room(self, room_id):
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = {'seq': 0, 'size': 0, 'mailboxes': {}}
+        return room
+
+    def _evict_oldest(self, room):
+        mailboxes = room['mailboxes']
+        key = min(mailboxes, key=lambda k: mailboxes[k][0]['seq'])
+        mailboxes[key].popleft()
+        room['size'] -= 1
+        if not mailboxes[key]:
+            del mailboxes[key]
+
+    def post(self, room_id, signal):
+        """Store a signal for its recipient and return its sequence number"""
+        with self._lock:
+            room = self._room(room_id)
+            room['seq'] += 1
+            signal['seq'] = room['seq']
+
+            key = signal.get('to') or BROADCAST
+            room['mailboxes'].setdefault(key, deque()).append(signal)
+            room['size'] += 1
+
+            while room['size'] > self.room_cap:
+                self._evict_oldest(room)
+
+            return signal['seq']
+
+    def fetch(self, room_id, user_id, after=0):
+        """Signals for ``user_id`` newer than ``after``, plus the next cursor.
+
+        Signals up to ``after`` are treated as acknowledged and removed from
+        the user's mailbox. Broadcast signals sent by the user are skipped.
+        """
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is None:
+                return [], after
+
+            mailboxes = room['mailboxes']
+            private = mailboxes.get(user_id)
+            if private is not None:
+                while private and private[0]['seq'] <= after:
+                    private.popleft()
+                    room['size'] -= 1
+                if not private:
+                    del mailboxes[user_id]
+                    private = None
+
+            pending = list(private) if private else []
+            broadcast = [s for s in mailboxes.get(BROADCAST, ())
+                         if s['seq'] > after and s.get('from') != user_id]
+
+            signals = list(heapq.merge(pending, broadcast, key=lambda s: s['seq']))
+            return signals, max(after, room['seq'])
+
+    def recent(self, room_id, limit=20):
+        """The newest signals in a room regardless of recipient"""
+        with self._lock:
+            room = self._rooms.get(room_id)
+            if room is None:
+                return []
+            signals = heapq.merge(*room['mailboxes'].values(), key=lambda s: s['seq'])
+            return list(signals)[-limit:]
+
+    def depth(self, room_id):
+        with self._lock:
+            room = self._rooms.get(room_id)
+            return room['size'] if room else 0
+
+    def stats(self):
+        """Room count plus total and largest per-room signal backlog"""
+        with self._lock:
+            depths = [room['size'] for room in self._rooms.values()]
+        return {
+            'rooms': len(depths),
+            'signals': sum(depths),
+            'max_room_depth': max(depths, default=0)
+        }
+
+    def drop_room(self, room_id):
+        with self._lock:
+            self._rooms.pop(room_id, None)
@@ -0,0 +1,308 @@
+import os
+import threading
+import time
+
+import database as db
+from applog import get_logger
+from presence import EMPTY_ROOM_TTL, USER_TIMEOUT, PresenceTracker
+from signaling import ROOM_SIGNAL_CAP, SignalStore
+
+log = get_logger('state')
+
+# "memory" keeps rooms, signals and presence in this process (one worker);
+# "sqlite" shares them through the database so any number of worker
+# processes on the host can serve the same rooms
+STATE_BACKEND = os.environ.get('STATE_BACKEND', 'memory').lower()
+
+# How often a worker looks for chat messages committed by other workers
+FEED_POLL_INTERVAL = float(os.environ.get('STATE_POLL_INTERVAL_MS', '100')) / 1000
+FEED_BATCH_SIZE = 500
+
+# Longest sleep between presence sweeps; other workers may add deadlines
+SWEEP_MAX_INTERVAL = 1.0
+
+class MemoryState:
+    """Rooms, signals and presence held in this process.
+
+    Chat messages are delivered to the local cache, long-pollers and
+    stream subscribers as soon as they are saved.
+    """
+
+    name = 'memory'
+    # Every signal is posted in this process, so sockets are woken directly
+    poll_interval = None
+
+    def __init__(self, on_user_expired=None):
+        self.signals = SignalStore()
+        self.presence = PresenceTracker(on_user_expired=on_user_expired,
+                                        on_room_closed=self.signals.drop_room)
+        self._deliver = None
+
+    def start(self, deliver):
+        """Start background work; ``deliver(message)`` fans a saved chat message out locally"""
+        self._deliver = deliver
+        self.presence.start()
+
+    def stop(self):
+        self.presence.stop()
+
+    def publish_chat(self, message):
+        self._deliver(message)
+
+    def stats(self):
+        return {'backend': self.name, 'presence': self.presence.stats(), 'signals': self.signals.stats()}
+
+class SQLiteSignalStore:
+    """SignalStore backed by the rtc_signals table.
+
+    Sequence numbers are global rather than per room, which keeps cursors
+    increasing per room just the same.
+    """
+
+    def __init__(self, room_cap=ROOM_SIGNAL_CAP):
+        self.room_cap = room_cap
+
+    def post(self, room_id, signal):
+        return db.post_signal(room_id, signal, self.room_cap)
+
+    def fetch(self, room_id, user_id, after=0):
+        return db.fetch_signals(room_id, user_id, after)
+
+    def recent(self, room_id, limit=20):
+        return db.recent_signals(room_id, limit)
+
+    def depth(self, room_id):
+        return db.get_signal_depth(room_id)
+
+    def stats(self):
+        return db.get_signal_stats()
+
+    def drop_room(self, room_id):
+        db.drop_signal_room(room_id)
+
+class SQLitePresence:
+    """PresenceTracker backed by the rtc_rooms and rtc_presence tables.
+
+    Deadlines are wall-clock times so every process agrees on them. Each
+    process runs a sweeper that sleeps until the earliest deadline
+    (indexed, so the table works as the timer heap) and reaps expired
+    users and rooms; ``on_user_expired`` runs only in the process that
+    reaped the user. Heartbeats are written at most three times per
+    ``user_timeout`` for each user, so most polls stay read-only.
+    """
+
+    def __init__(self, user_timeout=USER_TIMEOUT, room_ttl=EMPTY_ROOM_TTL,
+                 on_user_expired=None, clock=time.time):
+        self.user_timeout = user_timeout
+        self.room_ttl = room_ttl
+        self.on_user_expired = on_user_expired
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._written = {}  # (room, user) -> clock() of the last heartbeat write
+        self._expired_users = 0
+        self._closed_rooms = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return db.get_presence_counts()[0]
+
+    def join(self, room_id, username, user_id):
+        now = self.clock()
+        user_id, joined = db.presence_join(room_id, username, user_id, now + self.user_timeout)
+        with self._lock:
+            self._written[(room_id, user_id)] = now
+        return user_id, joined
+
+    def heartbeat(self, room_id, user_id):
+        now = self.clock()
+        key = (room_id, user_id)
+        with self._lock:
+            if now - self._written.get(key, 0) < self.user_timeout / 3:
+                return True
+            self._written[key] = now
+        return db.presence_heartbeat(room_id, user_id, now + self.user_timeout)
+
+    def leave(self, room_id, user_id):
+        with self._lock:
+            self._written.pop((room_id, user_id), None)
+        return db.presence_leave(room_id, user_id, self.clock() + self.room_ttl)
+
+    def touch(self, room_id):
+        db.presence_touch(room_id, self.clock() + self.room_ttl)
+
+    def has_room(self, room_id):
+        return db.presence_has_room(room_id)
+
+    def users(self, room_id):
+        return db.presence_users(room_id)
+
+    def user_count(self):
+        return db.get_presence_counts()[1]
+
+    def stats(self):
+        rooms, users = db.get_presence_counts()
+        with self._lock:
+            return {
+                'rooms': rooms,
+                'users': users,
+                'expired_users': self._expired_users,
+                'closed_rooms': self._closed_rooms
+            }
+
+    def expire(self, now=None):
+        """Reap users and empty rooms whose time is up; returns how many of each"""
+        now = self.clock() if now is None else now
+        expired, closed = db.reap_presence(now, self.room_ttl)
+        with self._lock:
+            self._expired_users += len(expired)
+            self._closed_rooms += len(closed)
+            # Forget heartbeat stamps old enough that the user has timed out
+            stale = now - self.user_timeout
+            self._written = {key: at for key, at in self._written.items() if at > stale}
+        for room_id, user in expired:
+            if self.on_user_expired:
+                self.on_user_expired(room_id, user)
+        return len(expired), len(closed)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                deadline = db.next_presence_deadline()
+                if deadline is not None and deadline <= self.clock():
+                    self.expire()
+                    continue
+                delay = SWEEP_MAX_INTERVAL if deadline is None else deadline - self.clock()
+            except Exception:
+                log.exception("Presence sweep failed")
+                delay = SWEEP_MAX_INTERVAL
+            self._stop.wait(min(max(delay, 0.01), SWEEP_MAX_INTERVAL))
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='presence-sweeper', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+class ChatFeed:
+    """Follows chat_messages by id and delivers every new row in order.
+
+    Each process tails the table from the newest id at startup, so a
+    message saved by any worker reaches this worker's cache, long-pollers
+    and stream subscribers within ``interval`` seconds. A local save wakes
+    the feed at once.
+    """
+
+    def __init__(self, deliver, interval=FEED_POLL_INTERVAL, batch_size=FEED_BATCH_SIZE):
+        self.deliver = deliver
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_id = db.get_last_chat_message_id()
+        self.delivered = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Deliver everything committed since the last poll; returns the count"""
+        count = 0
+        while True:
+            rows = db.get_chat_messages_after(self.last_id, self.batch_size)
+            for message_id, room, sender, message, timestamp in rows:
+                self.last_id = message_id
+                self.deliver({
+                    'id': message_id,
+                    'sender': sender,
+                    'message': message,
+                    'timestamp': timestamp,
+                    'room': room
+                })
+            count += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        self.delivered += count
+        return count
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.poll()
+            except Exception:
+                log.exception("Chat feed poll failed")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='chat-feed', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+class SQLiteState:
+    """Rooms, signals and presence shared through SQLite (WAL) by every worker.
+
+    Chat messages are already stored in SQLite; instead of delivering a
+    saved message directly, each worker's ChatFeed picks up every new row,
+    including its own, so all workers see one ordering.
+    """
+
+    name = 'sqlite'
+    # Signals posted by other workers only show up in the table
+    poll_interval = FEED_POLL_INTERVAL
+
+    def __init__(self, on_user_expired=None):
+        self.signals = SQLiteSignalStore()
+        self.presence = SQLitePresence(on_user_expired=on_user_expired)
+        self.feed = None
+
+    def start(self, deliver):
+        self.feed = ChatFeed(deliver)
+        self.feed.start()
+        self.presence.start()
+
+    def stop(self):
+        self.presence.stop()
+        if self.feed is not None:
+            self.feed.stop()
+
+    def publish_chat(self, message):
+        self.feed.wake()
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'presence': self.presence.stats(),
+            'signals': self.signals.stats(),
+            'chat_feed': {'last_id': self.feed.last_id, 'delivered': self.feed.delivered} if self.feed else None
+        }
+
+STATE_BACKENDS = {
+    'memory': MemoryState,
+    'sqlite': SQLiteState,
+}
+
+def create_state(name=STATE_BACKEND, **options):
+    """Build the configured state backend; ValueError for an unknown name"""
+    try:
+        backend = STATE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown STATE_BACKEND {name!r}, expected one of: {', '.join(STATE_BACKENDS)}")
+    return backend(**options)
@@ -28,6 +28,11 @@ class WebRTCManager {
         // Polling intervals
         this.signalingInterval = null;
         this.pollDelay = 2000; // 2 seconds
+        this.lastSignalSeq = 0;
+        
+        // WebSocket signaling; polling covers for it while it is down
+        this.socket = null;
+        this.socketRetryDelay = 5000; // 5 seconds
         
         console.log(`🎥 WebRTC Manager initialized: ${userName} in room ${roomId}`);
     }
@@ -112,7 +117,8 @@ class WebRTCManager {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
-                    username: this.userName
+                    username: this.userName,
+                    user_id: this.userId
                 })
             });
             
@@ -123,6 +129,8 @@ class WebRTCManager {
             const data = await response.json();
             
             if (data.status === 'success') {
+                // Rejoining under the same name keeps the id the server already has
+                this.userId = data.user_id;
                 console.log(`✅ Joined room successfully. Users: ${data.user_count}`);
                 
                 // Update participants list
@@ -146,6 +154,15 @@ class WebRTCManager {
     startSignaling() {
         console.log('📡 Starting signaling loop...');
         
+        this.startPolling();
+        this.connectSocket();
+    }
+    
+    startPolling() {
+        if (this.signalingInterval) {
+            return;
+        }
+        
         this.signalingInterval = setInterval(async () => {
             try {
                 await this.pollSignals();
@@ -155,9 +172,66 @@ class WebRTCManager {
         }, this.pollDelay);
     }
     
+    stopPolling() {
+        if (this.signalingInterval) {
+            clearInterval(this.signalingInterval);
+            this.signalingInterval = null;
+        }
+    }
+    
+    connectSocket() {
+        if (!('WebSocket' in window)) {
+            return;
+        }
+        
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const params = new URLSearchParams({ user: this.userId, after: this.lastSignalSeq });
+        const socket = new WebSocket(`${scheme}://${window.location.host}/ws/webrtc/${this.roomId}?${params}`);
+        let opened = false;
+        
+        socket.onopen = () => {
+            opened = true;
+            this.socket = socket;
+            this.stopPolling();
+            console.log('🔌 Signaling socket connected');
+        };
+        
+        socket.onmessage = (event) => {
+            const frame = JSON.parse(event.data);
+            
+            if (frame.event === 'signals') {
+                this.handleSignalsResponse(frame);
+            } else if (frame.event === 'error') {
+                console.error('❌ Signaling socket error:', frame.message);
+            }
+        };
+        
+        socket.onclose = () => {
+            if (this.socket === socket) {
+                this.socket = null;
+            }
+            
+            if (!this.isCallActive) {
+                return;
+            }
+            
+            // Keep signaling over HTTP; retry the socket only if it ever worked
+            this.startPolling();
+            if (opened) {
+                console.warn('⚠️ Signaling socket closed, polling until it reconnects');
+                setTimeout(() => {
+                    if (this.isCallActive && !this.socket) {
+                        this.connectSocket();
+                    }
+                }, this.socketRetryDelay);
+            }
+        };
+    }
+    
     async pollSignals() {
         try {
-            const response = await fetch(`/api/webrtc/signals/${this.roomId}`);
+            const params = new URLSearchParams({ user: this.userId, after: this.lastSignalSeq });
+            const response = await fetch(`/api/webrtc/signals/${this.roomId}?${params}`);
             
             if (!response.ok) {
                 console.warn(`⚠️ Signaling poll failed: ${response.status}`);
@@ -167,15 +241,7 @@ class WebRTCManager {
             const data = await response.json();
             
             if (data.status === 'success') {
-                // Process new signals
-                if (data.signals && data.signals.length > 0) {
-                    data.signals.forEach(signal => this.handleSignal(signal));
-                }
-                
-                // Update user count
-                if (data.users) {
-                    this.updateParticipantsList(data.users);
-                }
+                this.handleSignalsResponse(data);
             }
             
         } catch (error) {
@@ -183,6 +249,23 @@ class WebRTCManager {
         }
     }
     
+    handleSignalsResponse(data) {
+        // Process new signals (the server only returns ones addressed to us)
+        if (data.signals && data.signals.length > 0) {
+            data.signals.forEach(signal => this.handleSignal(signal));
+        }
+        
+        // Advance the cursor; it acknowledges everything handled so far
+        if (typeof data.last_seq === 'number') {
+            this.lastSignalSeq = data.last_seq;
+        }
+        
+        // Update user count
+        if (data.users) {
+            this.updateParticipantsList(data.users);
+        }
+    }
+    
     async sendSignal(type, targetUserId, data) {
         try {
             const signal = {
@@ -192,6 +275,12 @@ class WebRTCManager {
                 data: data
             };
             
+            if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+                this.socket.send(JSON.stringify({ event: 'signal', ...signal }));
+                console.log(`📡 Signal sent: ${type} to ${targetUserId || 'all'}`);
+                return;
+            }
+            
             const response = await fetch(`/api/webrtc/signal/${this.roomId}`, {
                 method: 'POST',
                 headers: {
@@ -523,9 +612,10 @@ class WebRTCManager {
             await this.leaveRoom();
             
             // Stop signaling
-            if (this.signalingInterval) {
-                clearInterval(this.signalingInterval);
-                this.signalingInterval = null;
+            this.stopPolling();
+            if (this.socket) {
+                this.socket.close();
+                this.socket = null;
             }
             
             // Close all peer connections
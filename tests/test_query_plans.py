@@ -0,0 +1,30 @@
+import pytest
+
+import database as db
+
+
+@pytest.fixture(scope='module')
+def migrated_db(tmp_path_factory):
+    """A freshly migrated database in place of chat.db"""
+    original = db.DB_PATH
+    db.DB_PATH = str(tmp_path_factory.mktemp('plans') / 'test.db')
+    db.migrate()
+    yield
+    db.close_pool()
+    db.DB_PATH = original
+
+
+@pytest.mark.parametrize('name', list(db.HOT_QUERIES))
+def test_hot_query_uses_an_index(migrated_db, name):
+    sql, params = db.HOT_QUERIES[name]
+    with db.connection() as conn:
+        plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+    scans = [step for step in plan if step.startswith('SCAN')]
+    temp_sorts = [step for step in plan if 'USE TEMP B-TREE' in step]
+    assert not scans, plan
+    assert not temp_sorts, plan
+
+
+def test_check_query_plans_is_clean(migrated_db):
+    assert db.check_query_plans() == []